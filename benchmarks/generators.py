@@ -0,0 +1,147 @@
+"""Seeded generators for benchmark inputs: random graphs and synthetic IMDB actor lists."""
+from itertools import accumulate
+import logging
+from math import log
+from random import Random
+from graphs.kevin_bacon import BACON
+from graphs.primitives import Graph
+
+_log = logging.getLogger(__name__)
+
+ACTORS_LIST_HEADER = """CRC: 0x00000000  File: actors.list  Date: Thu Jan  1 00:00:00 2015
+
+Copyright 1990-2015 The Internet Movie Database, Inc.  All rights reserved.
+
+RULES:
+1       Movies and recurring TV roles only, no TV guest appearances
+2       Please submit entries in the format outlined at the end of the list
+3       Feel free to submit new actors
+
+THE ACTORS LIST
+===============
+
+Name\t\t\tTitles
+----\t\t\t------
+"""
+
+ACTORS_LIST_FOOTER = """
+-----------------------------------------------------------------------------
+
+SUBMITTING UPDATES
+==================
+
+Synthetic list; there is nothing to submit.
+"""
+
+SURNAMES = ['Smith', 'Jones', 'Garcia', 'Nguyen', 'Okafor', 'Müller', 'Rossi', 'Kowalski', 'Tanaka', 'Silva']
+FORENAMES = ['Alex', 'Sam', 'Jo', 'Kim', 'Lee', 'Robin', 'Ana', 'Yuki', 'Noor', 'Chris']
+ROMAN_NUMERALS = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X']
+
+
+def erdos_renyi_graph(node_count, edge_probability, seed=0):
+    """Generate a G(n, p) random graph, labelled 0..n-1.
+
+    Skips over absent edges with geometrically distributed gaps, so it takes time linear in the
+    number of edges rather than n**2.
+    """
+    rng = Random(seed)
+    graph = Graph()
+    graph.add_nodes(range(node_count))
+    if edge_probability <= 0:
+        return graph
+
+    edges = []
+    log_miss = log(1 - edge_probability) if edge_probability < 1 else None
+    # Walk the lower triangle of the adjacency matrix, row 'head' and column 'tail' < head.
+    head, tail = 1, -1
+    while head < node_count:
+        gap = 0 if log_miss is None else int(log(1 - rng.random()) / log_miss)
+        tail += 1 + gap
+        while tail >= head and head < node_count:
+            tail -= head
+            head += 1
+        if head < node_count:
+            edges.append((tail, head))
+    graph.add_edges(edges)
+    return graph
+
+
+def power_law_graph(node_count, edges_per_node=2, seed=0):
+    """Generate a Barabasi-Albert preferential attachment graph, labelled 0..n-1.
+
+    Each new node joins 'edges_per_node' existing nodes chosen in proportion to their degree, so
+    the degree distribution follows a power law.
+    """
+    rng = Random(seed)
+    graph = Graph()
+    graph.add_nodes(range(node_count))
+
+    edges = []
+    # Every node appears here once per edge end, so a uniform choice is degree-proportional.
+    endpoints = list(range(min(edges_per_node, node_count)))
+    for node in range(len(endpoints), node_count):
+        targets = set()
+        while len(targets) < min(edges_per_node, node):
+            targets.add(rng.choice(endpoints))
+        for target in sorted(targets):
+            edges.append((node, target))
+            endpoints.extend([node, target])
+    graph.add_edges(edges)
+    return graph
+
+
+def _actor_name(rng, index):
+    name = '%s, %s %s' % (rng.choice(SURNAMES), rng.choice(FORENAMES), index)
+    if rng.random() < 0.1:
+        name += ' (%s)' % rng.choice(ROMAN_NUMERALS)
+    return name
+
+
+def _title_string(rng, index):
+    """Format a credit for title 'index' in one of the actors.list title styles."""
+    year = 1920 + index % 95
+    style = index % 5
+    if style == 0:
+        title = '"Show %s" (%s) {Episode %s (#1.%s)}' % (index, year, rng.randint(1, 20), rng.randint(1, 20))
+    elif style == 1:
+        title = 'Video %s (%s) (V)' % (index, year)
+    elif style == 2:
+        title = 'TV Movie %s (%s) (TV)' % (index, year)
+    else:
+        title = 'Film %s (%s)' % (index, year)
+
+    if rng.random() < 0.5:
+        title += '  [Role %s]' % rng.randint(1, 100)
+    if rng.random() < 0.5:
+        title += '  <%s>' % rng.randint(1, 50)
+    return title
+
+
+def generate_actor_titles(actor_count, title_count, titles_per_actor=5, seed=0):
+    """Generate (actor, title strings) records; the first actor is always Kevin Bacon.
+
+    Title popularity follows a Zipf distribution, so a few titles have very large casts.
+    """
+    rng = Random(seed)
+    cumulative_weights = list(accumulate(1 / rank for rank in range(1, title_count + 1)))
+
+    for index in range(actor_count):
+        actor = BACON if index == 0 else _actor_name(rng, index)
+        credit_count = max(1, min(title_count, int(rng.expovariate(1 / titles_per_actor)) + 1))
+        titles = set()
+        while len(titles) < credit_count:
+            titles.add(rng.choices(range(title_count), cum_weights=cumulative_weights)[0])
+        yield actor, [_title_string(rng, title) for title in sorted(titles)]
+
+
+def write_actors_list(path, actor_count, title_count, titles_per_actor=5, seed=0):
+    """Write a synthetic actors list in the IMDB format to 'path'."""
+    with open(path, 'w', encoding='latin1', errors='replace') as actor_file:
+        actor_file.write(ACTORS_LIST_HEADER)
+        for actor, titles in generate_actor_titles(actor_count, title_count, titles_per_actor, seed):
+            actor_file.write('%s\t\t%s\n' % (actor, titles[0]))
+            for title in titles[1:]:
+                actor_file.write('\t\t\t%s\n' % title)
+            actor_file.write('\n')
+        actor_file.write(ACTORS_LIST_FOOTER)
+    _log.info('Wrote %s actors to %s', actor_count, path)
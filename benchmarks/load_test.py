@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Load test a running Bacon server with concurrent queries.
+
+Actor names are read from a file, one per line, or sampled from the actors in a snapshot.
+
+Usage:
+    load_test.py [options] --names=<file>
+    load_test.py [options] --snapshot=<file>
+
+Options:
+    --host=<host>         Host of the server [default: 127.0.0.1].
+    --port=<port>         TCP port of the server [default: 8765].
+    --unix=<path>         Connect to a Unix socket at this path instead of TCP.
+    --connections=<n>     Number of client connections [default: 8].
+    --concurrency=<n>     Queries in flight on each connection [default: 4].
+    --queries=<n>         Total number of queries to send [default: 1000].
+    --op=<op>             Query operation, hops or path [default: hops].
+    --seed=<n>            Seed for sampling actor names [default: 0].
+"""
+import asyncio
+import logging
+from random import Random
+import time
+from docopt import docopt
+from graphs.bacon_client import BaconClient, BaconClientException
+from graphs.kevin_bacon import _is_title_label
+from graphs.snapshot import load_snapshot
+
+_log = logging.getLogger(__name__)
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def _run_connection(actors, operation, concurrency, connect, latencies, errors):
+    """Send every query in 'actors' over one connection, with up to 'concurrency' in flight."""
+    client = await connect()
+    queue = iter(actors)
+
+    async def run_queries():
+        for actor in queue:
+            start = time.perf_counter()
+            try:
+                await client.query(actor, operation)
+            except BaconClientException:
+                errors.append(actor)
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        await asyncio.gather(*(run_queries() for _ in range(concurrency)))
+    finally:
+        await client.close()
+
+
+async def run_load_test(actors, operation='hops', connections=8, concurrency=4, host='127.0.0.1', port=8765,
+                        unix_path=None):
+    """Send a query for each of 'actors', spread over 'connections'. Returns a dict of statistics."""
+    latencies = []
+    errors = []
+
+    def connect():
+        return BaconClient.connect(host, port, unix_path)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_run_connection(actors[i::connections], operation, concurrency, connect, latencies, errors)
+                           for i in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'queries': len(latencies),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'queries_per_second': len(latencies) / elapsed if elapsed else None,
+        'latency_p50': _percentile(latencies, 0.5),
+        'latency_p90': _percentile(latencies, 0.9),
+        'latency_p99': _percentile(latencies, 0.99),
+        'latency_max': latencies[-1] if latencies else None,
+    }
+
+
+def _sample_actors(names, count, seed):
+    rng = Random(seed)
+    return [rng.choice(names) for _ in range(count)]
+
+
+def main():
+    arguments = docopt(__doc__)
+    if arguments['--names']:
+        with open(arguments['--names'], encoding='utf-8') as names_file:
+            names = [line.rstrip('\n') for line in names_file if line.strip()]
+    else:
+        labels = load_snapshot(arguments['--snapshot']).labels
+        names = [labels[i] for i in range(len(labels)) if not _is_title_label(labels[i])]
+
+    actors = _sample_actors(names, int(arguments['--queries']), int(arguments['--seed']))
+    results = asyncio.run(run_load_test(actors, arguments['--op'], int(arguments['--connections']),
+                                        int(arguments['--concurrency']), arguments['--host'],
+                                        int(arguments['--port']), arguments['--unix']))
+
+    for name, value in results.items():
+        print('%-20s %s' % (name, '%.6f' % value if isinstance(value, float) else value))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+"""
+Benchmark the graph and actor list code on generated inputs.
+
+Usage:
+    run.py [options]
+    run.py --compare <baseline> <results>
+
+Options:
+    --sizes=<sizes>    Comma-separated size presets to run [default: small,medium].
+    --only=<names>     Comma-separated benchmarks to run (default: all).
+    --repeat=<n>       Time each benchmark this many times and keep the best [default: 3].
+    --output=<file>    Write the results as JSON to this file [default: bench_results.json].
+    --seed=<n>         Seed for the input generators [default: 0].
+    --compare          Compare two result files, printing the change in time and memory.
+"""
+from contextlib import contextmanager
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from docopt import docopt
+from benchmarks.generators import erdos_renyi_graph, power_law_graph, write_actors_list
+from graphs import vectorized
+from graphs.kevin_bacon import _seek_to_actors, _read_next_actor, _iter_actors, _create_actor_graph, BACON, END_OF_LIST
+from graphs.random_contraction import run_random_contraction_algorithm
+
+_log = logging.getLogger(__name__)
+
+RESULTS_VERSION = 1
+
+# Parameters for each size preset. The contraction algorithm is O(n**4), so it gets its own tiny sizes.
+SIZES = {
+    'small': {'actors': 1000, 'titles': 300, 'graph_nodes': 1000, 'contraction_nodes': 8},
+    'medium': {'actors': 10000, 'titles': 3000, 'graph_nodes': 10000, 'contraction_nodes': 12},
+    'large': {'actors': 100000, 'titles': 30000, 'graph_nodes': 100000, 'contraction_nodes': 16},
+}
+
+
+def _parse_readline(path):
+    """Parse the list a line at a time with _read_next_actor, stopping at the rule that ends it."""
+    count = 0
+    with open(path, 'r', encoding='latin1') as actor_file:
+        _seek_to_actors(actor_file)
+        while _read_next_actor(actor_file)[0] is not None:
+            count += 1
+    return count
+
+
+def _parse_stream(path):
+    with open(path, 'r', encoding='latin1') as actor_file:
+        return sum(1 for _ in _iter_actors(actor_file))
+
+
+def _read_actor_titles(path):
+    with open(path, 'r', encoding='latin1') as actor_file:
+        return dict(_iter_actors(actor_file))
+
+
+def _benchmarks(size, directory, seed):
+    """Yield (name, params, setup, run) for each benchmark at 'size'.
+
+    'setup' builds the input outside the timed region, and 'run' takes its result.
+    """
+    params = SIZES[size]
+    actors_path = os.path.join(directory, 'actors-%s.list' % size)
+    actor_params = {'actors': params['actors'], 'titles': params['titles']}
+    write_actors_list(actors_path, params['actors'], params['titles'], seed=seed)
+
+    yield 'parse_readline', actor_params, lambda: actors_path, _parse_readline
+    yield 'parse_stream', actor_params, lambda: actors_path, _parse_stream
+    yield 'create_actor_graph', actor_params, lambda: _read_actor_titles(actors_path), _create_actor_graph
+
+    def bacon_bfs(graph):
+        return graph.breadth_first_search(graph.get_node_by_label(BACON))
+    yield ('breadth_first_search', actor_params,
+           lambda: _create_actor_graph(_read_actor_titles(actors_path)), bacon_bfs)
+
+    graph_nodes = params['graph_nodes']
+    er_params = {'nodes': graph_nodes, 'p': 2 / graph_nodes}
+    yield ('bfs_connected_regions_erdos_renyi', er_params,
+           lambda: erdos_renyi_graph(graph_nodes, 2 / graph_nodes, seed=seed), lambda graph: graph.bfs_connected_regions())
+    pl_params = {'nodes': graph_nodes, 'edges_per_node': 2}
+    yield ('bfs_connected_regions_power_law', pl_params,
+           lambda: power_law_graph(graph_nodes, 2, seed=seed), lambda graph: graph.bfs_connected_regions())
+
+    if vectorized.numpy is not None:
+        yield ('vectorized_bfs_power_law', pl_params,
+               lambda: vectorized.VectorizedGraph.from_graph(power_law_graph(graph_nodes, 2, seed=seed)),
+               lambda graph: graph.breadth_first_layers([0]))
+
+    contraction_nodes = params['contraction_nodes']
+    yield ('random_contraction', {'nodes': contraction_nodes, 'p': 0.5},
+           lambda: erdos_renyi_graph(contraction_nodes, 0.5, seed=seed), run_random_contraction_algorithm)
+
+
+@contextmanager
+def _quiet_logging():
+    """Silence debug logging, which would otherwise dominate the timings."""
+    previous_level = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        yield
+    finally:
+        logging.disable(previous_level)
+
+
+def _measure(setup, run, repeat):
+    """Return the best wall time over 'repeat' runs, and the peak memory allocated by one run."""
+    times = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        run(argument)
+        times.append(time.perf_counter() - start)
+
+    # Measure memory on a separate run, as tracing allocations slows everything down.
+    argument = setup()
+    tracemalloc.start()
+    try:
+        run(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes, only=None, repeat=3, seed=0):
+    """Run the benchmarks at each size, returning the results as a JSON-serializable dict."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory, _quiet_logging():
+        for size in sizes:
+            for name, params, setup, run in _benchmarks(size, directory, seed):
+                if only and name not in only:
+                    continue
+                seconds, peak_bytes = _measure(setup, run, repeat)
+                print('%-36s %-8s %10.4fs %12s bytes' % (name, size, seconds, peak_bytes))
+                results.append({'benchmark': name, 'size': size, 'params': params,
+                                'seconds': seconds, 'peak_bytes': peak_bytes})
+
+    return {
+        'version': RESULTS_VERSION,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare_results(baseline, results):
+    """Yield (benchmark, size, time ratio, memory ratio) for benchmarks present in both result sets."""
+    baseline_results = {(result['benchmark'], result['size']): result for result in baseline['results']}
+    for result in results['results']:
+        key = (result['benchmark'], result['size'])
+        if key in baseline_results:
+            before = baseline_results[key]
+            yield (key[0], key[1],
+                   result['seconds'] / before['seconds'] if before['seconds'] else None,
+                   result['peak_bytes'] / before['peak_bytes'] if before['peak_bytes'] else None)
+
+
+def _format_ratio(ratio):
+    return 'n/a' if ratio is None else '%.2fx' % ratio
+
+
+def main():
+    arguments = docopt(__doc__)
+
+    if arguments['--compare']:
+        with open(arguments['<baseline>']) as baseline_file, open(arguments['<results>']) as results_file:
+            comparison = compare_results(json.load(baseline_file), json.load(results_file))
+            print('%-36s %-8s %10s %10s' % ('benchmark', 'size', 'time', 'memory'))
+            for name, size, time_ratio, memory_ratio in comparison:
+                print('%-36s %-8s %10s %10s' % (name, size, _format_ratio(time_ratio), _format_ratio(memory_ratio)))
+        return
+
+    only = arguments['--only'].split(',') if arguments['--only'] else None
+    results = run_benchmarks(arguments['--sizes'].split(','), only=only, repeat=int(arguments['--repeat']),
+                             seed=int(arguments['--seed']))
+    with open(arguments['--output'], 'w') as output_file:
+        json.dump(results, output_file, indent=2)
+    print('Wrote results to %s' % arguments['--output'])
+
+
+if __name__ == '__main__':
+    main()
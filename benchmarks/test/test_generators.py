@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from benchmarks.generators import erdos_renyi_graph, power_law_graph, generate_actor_titles, write_actors_list
+from benchmarks.run import _parse_readline, compare_results
+from graphs.kevin_bacon import _iter_actors, BACON
+
+
+class TestGenerators(unittest.TestCase):
+    def test_erdos_renyi_graph(self):
+        """Test that G(n, p) graphs are seeded, simple, and complete when p is 1."""
+        graph = erdos_renyi_graph(200, 0.05, seed=3)
+        edges = sorted((edge.tail.label, edge.head.label) for edge in graph.edges)
+
+        self.assertEqual(edges, sorted((edge.tail.label, edge.head.label)
+                                       for edge in erdos_renyi_graph(200, 0.05, seed=3).edges))
+        self.assertEqual(len(edges), len(set(edges)))
+        self.assertTrue(all(tail < head for tail, head in edges))
+        # The expected edge count is 0.05 * 200 * 199 / 2 = 995.
+        self.assertTrue(850 < len(edges) < 1150)
+
+        self.assertEqual(len(erdos_renyi_graph(10, 1).edges), 45)
+        self.assertEqual(len(erdos_renyi_graph(10, 0).edges), 0)
+
+    def test_power_law_graph(self):
+        """Test that each new node in a preferential attachment graph adds the requested edges."""
+        graph = power_law_graph(100, edges_per_node=3, seed=1)
+
+        self.assertEqual(len(graph.nodes), 100)
+        self.assertEqual(len(graph.edges), 3 * (100 - 3))
+        self.assertEqual(len(graph.bfs_connected_regions()), 1)
+
+    def test_actors_list(self):
+        """Test that a synthetic actors list parses back into the generated records."""
+        records = list(generate_actor_titles(50, 20, seed=5))
+        self.assertEqual(records[0][0], BACON)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'actors.list')
+            write_actors_list(path, 50, 20, seed=5)
+            with open(path, 'r', encoding='latin1') as actor_file:
+                parsed = list(_iter_actors(actor_file))
+            readline_count = _parse_readline(path)
+
+        self.assertEqual(len(parsed), 50)
+        self.assertEqual(readline_count, 50)
+        self.assertEqual([actor for actor, _ in parsed], [actor for actor, _ in records])
+        for (_, titles), (_, title_strings) in zip(parsed, records):
+            self.assertEqual(len(titles), len(title_strings))
+
+    def test_compare_results(self):
+        """Test that comparing results gives time and memory ratios for benchmarks in both runs."""
+        baseline = {'results': [{'benchmark': 'bfs', 'size': 'small', 'seconds': 2.0, 'peak_bytes': 100},
+                                {'benchmark': 'parse', 'size': 'small', 'seconds': 1.0, 'peak_bytes': 0}]}
+        results = {'results': [{'benchmark': 'bfs', 'size': 'small', 'seconds': 1.0, 'peak_bytes': 150},
+                               {'benchmark': 'parse', 'size': 'small', 'seconds': 1.0, 'peak_bytes': 10},
+                               {'benchmark': 'new', 'size': 'small', 'seconds': 1.0, 'peak_bytes': 10}]}
+
+        self.assertEqual(list(compare_results(baseline, results)),
+                         [('bfs', 'small', 0.5, 1.5), ('parse', 'small', 1.0, None)])
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Client for the Bacon number query server.
+
+Usage:
+    bacon_client.py [options] <actor_name>...
+
+Options:
+    --host=<host>  Host of the server [default: 127.0.0.1].
+    --port=<port>  TCP port of the server [default: 8765].
+    --unix=<path>  Connect to a Unix socket at this path instead of TCP.
+    --path         Print the path to Kevin Bacon, not just the number of hops.
+"""
+import asyncio
+from itertools import count
+import json
+import logging
+from docopt import docopt
+
+_log = logging.getLogger(__name__)
+
+
+class BaconClientException(Exception):
+    pass
+
+
+class BaconClient:
+    """An asyncio connection to a Bacon server. Queries may be awaited concurrently."""
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = count()
+        self._waiting = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        else:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        return cls(reader, writer)
+
+    async def query(self, actor, operation='hops'):
+        """Send a query and return the server's response dict. Raises BaconClientException on an error."""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        self._writer.write(json.dumps({'id': request_id, 'op': operation, 'actor': actor}).encode('utf-8') + b'\n')
+        await self._writer.drain()
+
+        response = await future
+        if 'error' in response:
+            raise BaconClientException(response['error'])
+        return response
+
+    async def hops(self, actor):
+        """Get the number of hops from 'actor' to Kevin Bacon, or None if they aren't connected."""
+        return (await self.query(actor, 'hops'))['hops']
+
+    async def path(self, actor):
+        """Get the actors on a shortest path from 'actor' to Kevin Bacon, or [] if they aren't connected."""
+        return (await self.query(actor, 'path'))['path']
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
+
+    async def _receive(self):
+        """Match responses to the queries waiting for them, by id."""
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._waiting.pop(response.pop('id', None), None)
+                if future is None:
+                    _log.warning('Unexpected response: %s', response)
+                elif not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(BaconClientException('Connection closed.'))
+            self._waiting.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+async def _query_actors(actors, host, port, unix_path, operation):
+    async with await BaconClient.connect(host, port, unix_path) as client:
+        return await asyncio.gather(*(client.query(actor, operation) for actor in actors), return_exceptions=True)
+
+
+def main():
+    arguments = docopt(__doc__)
+    actors = arguments['<actor_name>']
+    operation = 'path' if arguments['--path'] else 'hops'
+    responses = asyncio.run(_query_actors(actors, arguments['--host'], int(arguments['--port']),
+                                          arguments['--unix'], operation))
+
+    for actor, response in zip(actors, responses):
+        if isinstance(response, BaconClientException):
+            print('%s: %s' % (actor, response))
+        elif response['hops'] is None:
+            print('%s: No path found.' % actor)
+        elif operation == 'path':
+            print('%s: %s' % (actor, ' -> '.join(response['path'])))
+        else:
+            print('%s: Found path in %s hops.' % (actor, response['hops']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""The Bacon number of every actor, saved to a file that queries map instead of parsing.
+
+An index file is a header followed by five sections, each padded to a multiple of 8 bytes:
+
+    hops           int16[count]      Bacon number of each actor, or NOT_CONNECTED
+    parents        int32[count]      position of the actor each was reached from
+    label_offsets  int64[count + 1]  offsets of each label in the string table
+    label_order    int32[count]      positions sorted by label, for binary search
+    string table   UTF-8 labels, back to back
+
+Loading maps the file, so a query reads a few pages instead of decoding every actor's name.
+"""
+from array import array
+from collections import Counter
+import logging
+import mmap
+import struct
+from graphs.compact import OFFSET_TYPECODE, TARGET_TYPECODE
+from graphs.snapshot import LabelIndex, LabelTable, SnapshotException, encode_string_table, read_sections, \
+    sorted_label_order, write_sections
+
+_log = logging.getLogger(__name__)
+
+INDEX_MAGIC = b'BACONIDX'
+INDEX_VERSION = 2
+# Magic, version, actor count, string table size.
+HEADER = struct.Struct('<8sIIQ')
+HOPS_TYPECODE = 'h'
+PARENT_TYPECODE = 'i'
+NOT_CONNECTED = -1
+
+
+class BaconIndexException(Exception):
+    pass
+
+
+class BaconIndex:
+    """The Bacon number and BFS parent of every actor, computed by a single BFS from the source.
+
+    Actors are stored by position: hops[i] is the number of hops from the source to labels[i]
+    (NOT_CONNECTED if there is no path) and parents[i] is the position of the actor it was reached
+    from (NOT_CONNECTED for the source itself).
+
+    'positions' maps a label to its position; if not given, a dict is built from 'labels'.
+    """
+    def __init__(self, labels, hops, parents, positions=None):
+        self.labels = labels
+        self.hops = hops
+        self.parents = parents
+        if positions is None:
+            positions = {label: i for i, label in enumerate(labels)}
+        self._positions = positions
+
+    @classmethod
+    def build(cls, graph, source_label, nodes=None, layer_step=1):
+        """Build the index from a single breadth-first search of 'graph'.
+
+        'nodes' restricts the index to some of the graph's nodes (by default, all of them), in which
+        case each node's parent is its nearest indexed ancestor in the BFS tree. BFS layers are
+        divided by 'layer_step', for graphs which put intermediate nodes between actors.
+        """
+        positions = {node: i for i, node in enumerate(graph.nodes if nodes is None else nodes)}
+        hops = array(HOPS_TYPECODE, [NOT_CONNECTED]) * len(positions)
+        parents = array(PARENT_TYPECODE, [NOT_CONNECTED]) * len(positions)
+
+        tree = graph.breadth_first_tree(graph.get_node_by_label(source_label))
+        for node, (layer, edge) in tree.items():
+            position = positions.get(node)
+            if position is None:
+                continue
+            hops[position] = layer // layer_step
+            while edge is not None:
+                node = edge.get_other_node(node)
+                if node in positions:
+                    parents[position] = positions[node]
+                    break
+                edge = tree[node][1]
+
+        _log.info('Indexed %s actors, %s connected to %s',
+                  len(positions), sum(1 for hop in hops if hop != NOT_CONNECTED), source_label)
+        return cls([node.label for node in positions], hops, parents)
+
+    def save(self, path):
+        """Write the index to 'path' as a header, the hop and parent arrays, and the sorted label table."""
+        label_offsets, strings = encode_string_table(self.labels)
+        with open(path, 'wb') as index_file:
+            index_file.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(self.labels), len(strings)))
+            write_sections(index_file, [array(HOPS_TYPECODE, self.hops), array(PARENT_TYPECODE, self.parents),
+                                        label_offsets, sorted_label_order(self.labels), strings])
+
+    @classmethod
+    def load(cls, path):
+        """Map the index at 'path'. Labels are decoded and looked up in the mapping, on demand."""
+        with open(path, 'rb') as index_file:
+            data = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(data) < HEADER.size:
+            raise BaconIndexException('%s is too short to be a Bacon index.' % path)
+        magic, version, count, strings_size = HEADER.unpack_from(data)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise BaconIndexException('%s is not a version %s Bacon index.' % (path, INDEX_VERSION))
+
+        try:
+            hops, parents, label_offsets, label_order, strings = read_sections(
+                data, HEADER.size, [(HOPS_TYPECODE, count),
+                                    (PARENT_TYPECODE, count),
+                                    (OFFSET_TYPECODE, count + 1),
+                                    (TARGET_TYPECODE, count),
+                                    ('B', strings_size)])
+        except SnapshotException:
+            raise BaconIndexException('%s is truncated.' % path)
+
+        labels = LabelTable(strings, label_offsets)
+        return cls(labels, hops, parents, positions=LabelIndex(labels, label_order))
+
+    def _position(self, actor):
+        try:
+            return self._positions[actor]
+        except KeyError:
+            raise BaconIndexException('Actor "%s" is not in the index.' % actor)
+
+    def get_hops(self, actor):
+        """Get the Bacon number of 'actor', or None if they aren't connected to the source."""
+        hops = self.hops[self._position(actor)]
+        return None if hops == NOT_CONNECTED else hops
+
+    def get_path(self, actor):
+        """Get the list of actors from 'actor' back to the source, or [] if they aren't connected."""
+        position = self._position(actor)
+        if self.hops[position] == NOT_CONNECTED:
+            return []
+
+        path = [self.labels[position]]
+        while self.parents[position] != NOT_CONNECTED:
+            position = self.parents[position]
+            path.append(self.labels[position])
+        return path
+
+    def distribution(self):
+        """Count the actors with each Bacon number. Unconnected actors are counted under None."""
+        counts = Counter(self.hops)
+        distribution = {hops: counts[hops] for hops in sorted(counts) if hops != NOT_CONNECTED}
+        if NOT_CONNECTED in counts:
+            distribution[None] = counts[NOT_CONNECTED]
+        return distribution
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+Bacon number query server. Loads the actor graph once and answers queries over a socket.
+
+The graph is held as a snapshot, which every worker process maps, so the workers share one copy of
+it. Searches run in the worker pool, keeping the event loop free to accept connections and read
+requests while they run.
+
+Requests and responses are JSON objects, one per line. A request names an operation ("hops" or
+"path") and an actor, and may carry an "id" that is copied to its response:
+
+    {"id": 1, "op": "path", "actor": "Aanaahad"}
+    {"id": 1, "actor": "Aanaahad", "hops": 2, "path": ["Aanaahad", "...", "Bacon, Kevin (I)"]}
+
+Requests on one connection are answered concurrently, so responses may arrive out of order. Bad
+requests and unknown actors get a response with an "error" message.
+
+Usage:
+    bacon_server.py [options] [--bipartite]
+    bacon_server.py [options] --snapshot=<file>
+
+Options:
+    --host=<host>      Host to listen on [default: 127.0.0.1].
+    --port=<port>      TCP port to listen on [default: 8765].
+    --unix=<path>      Listen on a Unix socket at this path instead of TCP.
+    --workers=<n>      Number of search processes; 0 searches in a thread of the server [default: 2].
+    --snapshot=<file>  Load the graph from a snapshot instead of parsing the actor list.
+    --bipartite        Join actors to title nodes instead of joining every pair of co-stars.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import json
+import logging
+import os
+import tempfile
+from docopt import docopt
+from graphs.kevin_bacon import find_actor_path, read_actor_graph
+from graphs.primitives import GraphException
+from graphs.snapshot import load_snapshot, write_snapshot
+
+_log = logging.getLogger(__name__)
+
+OPERATIONS = ('hops', 'path')
+# Lines longer than this are rejected, so a client can't make the server buffer without limit.
+MAX_REQUEST_SIZE = 1 << 16
+
+# The graph searched by _answer_query in this process, set by _init_query_worker.
+_worker_graph = None
+
+
+class BaconServerException(Exception):
+    pass
+
+
+def _init_query_worker(snapshot_path):
+    global _worker_graph
+    _worker_graph = load_snapshot(snapshot_path)
+
+
+def _answer_query(operation, actor):
+    """Search for 'actor' in this process's graph, returning the response fields as a dict."""
+    try:
+        actors = find_actor_path(_worker_graph, actor)
+    except GraphException:
+        return {'actor': actor, 'error': 'Unknown actor.'}
+    response = {'actor': actor, 'hops': len(actors) - 1 if actors else None}
+    if operation == 'path':
+        response['path'] = actors
+    return response
+
+
+def _decode_request(line):
+    """Decode a request line into a dict. Raises BaconServerException if it isn't a JSON object."""
+    try:
+        request = json.loads(line)
+    except ValueError:
+        raise BaconServerException('Request is not valid JSON.')
+    if not isinstance(request, dict):
+        raise BaconServerException('Request must be a JSON object.')
+    return request
+
+
+def _parse_request(request):
+    """Get (operation, actor) from a decoded request. Raises BaconServerException if it's invalid."""
+    operation = request.get('op', 'hops')
+    if operation not in OPERATIONS:
+        raise BaconServerException('Unknown operation %r.' % (operation,))
+    actor = request.get('actor')
+    if not isinstance(actor, str):
+        raise BaconServerException('Request needs an "actor" string.')
+    return operation, actor
+
+
+class BaconServer:
+    """Answers queries on the snapshot at 'snapshot_path', using 'workers' search processes."""
+    def __init__(self, snapshot_path, workers=2):
+        self.snapshot_path = snapshot_path
+        self.workers = workers
+        self._executor = None
+        self._server = None
+
+    async def start(self, host='127.0.0.1', port=0, unix_path=None):
+        """Load the graph and start listening. With port 0, the OS picks a free port; see 'address'."""
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_query_worker,
+                                                 initargs=(self.snapshot_path,))
+        else:
+            _init_query_worker(self.snapshot_path)
+
+        if unix_path is None:
+            self._server = await asyncio.start_server(self._handle_connection, host, port,
+                                                      limit=MAX_REQUEST_SIZE)
+        else:
+            self._server = await asyncio.start_unix_server(self._handle_connection, unix_path,
+                                                           limit=MAX_REQUEST_SIZE)
+        _log.info('Listening on %s', self.address)
+
+    @property
+    def address(self):
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def _handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        pending = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line was longer than the limit.
+                    await self._respond(writer, write_lock, {'error': 'Request too long.'})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(self._handle_request(line, writer, write_lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.wait(pending)
+        except ConnectionError:
+            _log.info('Client disconnected')
+        finally:
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def _handle_request(self, line, writer, write_lock):
+        # Every request gets a response carrying its id, even if it's invalid or the search fails,
+        # so that the client never waits for an answer that won't come.
+        request_id = None
+        try:
+            request = _decode_request(line)
+            request_id = request.get('id')
+            operation, actor = _parse_request(request)
+        except BaconServerException as e:
+            response = {'error': str(e)}
+        else:
+            loop = asyncio.get_running_loop()
+            try:
+                response = await loop.run_in_executor(self._executor, _answer_query, operation, actor)
+            except Exception as e:
+                _log.exception('Search for %s failed', actor)
+                response = {'actor': actor, 'error': 'Search failed: %s' % e}
+
+        if request_id is not None:
+            response['id'] = request_id
+        await self._respond(writer, write_lock, response)
+
+    @staticmethod
+    async def _respond(writer, write_lock, response):
+        async with write_lock:
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            await writer.drain()
+
+
+async def _serve(snapshot_path, workers, host, port, unix_path):
+    server = BaconServer(snapshot_path, workers)
+    await server.start(host, port, unix_path)
+    print('Serving on %s' % (server.address,))
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    arguments = docopt(__doc__)
+    workers = int(arguments['--workers'])
+    serve_arguments = (workers, arguments['--host'], int(arguments['--port']), arguments['--unix'])
+
+    try:
+        if arguments['--snapshot']:
+            asyncio.run(_serve(arguments['--snapshot'], *serve_arguments))
+            return
+
+        # Save the parsed graph as a temporary snapshot, so the workers can share it.
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_path = os.path.join(directory, 'actors.snapshot')
+            write_snapshot(read_actor_graph(bipartite=arguments['--bipartite']), snapshot_path)
+            asyncio.run(_serve(snapshot_path, *serve_arguments))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
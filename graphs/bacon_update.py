@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+"""
+Incremental Bacon numbers: apply each new release of the actor list to saved state, repairing the
+distances of the actors it affects instead of searching the whole graph again.
+
+The state file holds every actor's titles, Bacon number and BFS parent. --init parses a list and
+saves its state; later runs load the state, apply the differences in a new list, and save the
+state again.
+
+Usage:
+    bacon_update.py [options] --init <actor_list>
+    bacon_update.py [options] <actor_list>
+
+Options:
+    --state=<file>    Saved actor titles and distances [default: bacon.state].
+    --index=<file>    Also save a Bacon index of the updated distances, for kevin_bacon.py queries.
+    --workers=<n>     Number of processes used to parse the actor list [default: 1].
+"""
+from array import array
+from heapq import heappop, heappush
+from itertools import count
+import logging
+import struct
+from docopt import docopt
+from graphs.bacon_index import BaconIndex, PARENT_TYPECODE, HOPS_TYPECODE, NOT_CONNECTED
+from graphs.compact import OFFSET_TYPECODE, TARGET_TYPECODE
+from graphs.kevin_bacon import BACON, _read_actor_file
+from graphs.snapshot import LabelTable, SnapshotException, encode_string_table, read_sections, write_sections
+
+_log = logging.getLogger(__name__)
+
+STATE_MAGIC = b'BACONUPD'
+STATE_VERSION = 1
+# Magic, version, source position, actor count, title count, credit count, actor and title string table sizes.
+HEADER = struct.Struct('<8sIIIIQQQ')
+
+
+class BaconUpdateException(Exception):
+    pass
+
+
+class IncrementalBaconIndex:
+    """The credits of every actor and their distance from the source, kept up to date as the actor
+    list changes.
+
+    The co-star graph is never built: an actor's neighbours are found on demand, as the casts of
+    their titles. update() diffs a new actor -> titles mapping against the current one, applies
+    just the (actor, title) credits that were added or removed, and repairs the distances with a
+    dynamic shortest path update, instead of searching the whole graph again. Deletions are
+    repaired first: the actors that lost every shortest path are found in order of distance, and
+    only they are searched again. Insertions then relax distances outwards from the new credits.
+
+    'distances' restores saved state instead of searching: it maps each connected actor to their
+    (hops, parent actor), with a parent of None for the source.
+    """
+    def __init__(self, actor_titles, source_label, distances=None):
+        self.source_label = source_label
+        self.actor_titles = self._normalize(actor_titles)
+        if source_label not in self.actor_titles:
+            raise BaconUpdateException('The source "%s" is not in the actor list.' % source_label)
+        self.films_to_actors = {}
+        for actor, titles in self.actor_titles.items():
+            for title in titles:
+                self.films_to_actors.setdefault(title, set()).add(actor)
+        # The distance before the current update of every actor whose distance it has touched.
+        self._hops_before = {}
+
+        if distances is not None:
+            self._hops = {actor: hops for actor, (hops, _) in distances.items()}
+            self._parents = {actor: parent for actor, (_, parent) in distances.items()}
+        else:
+            self._hops, self._parents = self._search()
+
+    def _search(self):
+        """Breadth-first search from the source, scanning the cast of each title once."""
+        actor_titles, films_to_actors = self.actor_titles, self.films_to_actors
+        hops = {self.source_label: 0}
+        parents = {self.source_label: None}
+        seen_titles = set()
+        frontier = [self.source_label]
+        while frontier:
+            next_frontier = []
+            for actor in frontier:
+                for title in actor_titles[actor]:
+                    if title in seen_titles:
+                        continue
+                    seen_titles.add(title)
+                    for co_star in films_to_actors[title]:
+                        if co_star not in hops:
+                            hops[co_star] = hops[actor] + 1
+                            parents[co_star] = actor
+                            next_frontier.append(co_star)
+            frontier = next_frontier
+        return hops, parents
+
+    def _co_stars(self, actor):
+        """Yield the actors sharing a title with 'actor', once per shared title, including 'actor' itself."""
+        films_to_actors = self.films_to_actors
+        for title in self.actor_titles[actor]:
+            yield from films_to_actors[title]
+
+    def update(self, actor_titles):
+        """Bring the credits and distances up to date with a new actor -> titles mapping.
+
+        Returns a dict counting the credits added and removed and the actors whose distance
+        changed.
+        """
+        self._hops_before = {}
+        new_actor_titles = self._normalize(actor_titles)
+        if self.source_label not in new_actor_titles:
+            raise BaconUpdateException('The source "%s" is not in the actor list.' % self.source_label)
+
+        # Repair each kind of change separately: the deletion repair relies on every remaining
+        # distance being exact, which an added credit could break.
+        removed_credits, departed_actors = self._remove_credits(new_actor_titles)
+        self._repair_deletions(removed_credits)
+        added_credits = self._add_credits(new_actor_titles)
+        self._repair_insertions(added_credits)
+        for actor in departed_actors:
+            del self.actor_titles[actor]
+            self._hops.pop(actor, None)
+            self._parents.pop(actor, None)
+            self._hops_before.pop(actor, None)
+
+        changed = sum(1 for actor, hops in self._hops_before.items() if self._hops.get(actor) != hops)
+        _log.info('Added %s and removed %s credits; %s actors changed distance',
+                  len(added_credits), len(removed_credits), changed)
+        return {'credits added': len(added_credits), 'credits removed': len(removed_credits), 'hops changed': changed}
+
+    def get_hops(self, actor):
+        """Get the distance of 'actor' from the source, or None if they aren't connected."""
+        if actor not in self.actor_titles:
+            raise BaconUpdateException('Actor "%s" is not in the actor list.' % actor)
+        return self._hops.get(actor)
+
+    def to_index(self):
+        """Build a BaconIndex of the current distances."""
+        positions = {actor: i for i, actor in enumerate(self.actor_titles)}
+        hops = array(HOPS_TYPECODE, [NOT_CONNECTED]) * len(positions)
+        parents = array(PARENT_TYPECODE, [NOT_CONNECTED]) * len(positions)
+        for actor, actor_hops in self._hops.items():
+            hops[positions[actor]] = actor_hops
+            parent = self._parents[actor]
+            if parent is not None:
+                parents[positions[actor]] = positions[parent]
+        return BaconIndex(list(positions), hops, parents)
+
+    def save(self, path):
+        """Write every actor's titles, hops and parent to 'path', to be restored by load().
+
+        The file is a header followed by these sections, each padded to a multiple of 8 bytes:
+        hops and parent positions per actor, offsets of each actor's credits, the title number of
+        each credit, and the actor and title string tables with their offsets.
+        """
+        actors = list(self.actor_titles)
+        positions = {actor: i for i, actor in enumerate(actors)}
+        title_numbers = {}
+        credit_offsets = array(OFFSET_TYPECODE, [0])
+        credits = array(TARGET_TYPECODE)
+        for actor in actors:
+            for title in self.actor_titles[actor]:
+                credits.append(title_numbers.setdefault(title, len(title_numbers)))
+            credit_offsets.append(len(credits))
+
+        hops = array(HOPS_TYPECODE, [NOT_CONNECTED]) * len(actors)
+        parents = array(PARENT_TYPECODE, [NOT_CONNECTED]) * len(actors)
+        for actor, actor_hops in self._hops.items():
+            hops[positions[actor]] = actor_hops
+            parent = self._parents[actor]
+            if parent is not None:
+                parents[positions[actor]] = positions[parent]
+
+        actor_offsets, actor_strings = encode_string_table(actors)
+        title_offsets, title_strings = encode_string_table(title_numbers)
+        with open(path, 'wb') as state_file:
+            state_file.write(HEADER.pack(STATE_MAGIC, STATE_VERSION, positions[self.source_label], len(actors),
+                                         len(title_numbers), len(credits), len(actor_strings), len(title_strings)))
+            write_sections(state_file, [hops, parents, credit_offsets, credits, actor_offsets, actor_strings,
+                                        title_offsets, title_strings])
+        _log.info('Saved %s actors and %s titles to %s', len(actors), len(title_numbers), path)
+
+    @classmethod
+    def load(cls, path):
+        """Restore state saved by save(), in time linear in the number of credits and without searching."""
+        with open(path, 'rb') as state_file:
+            data = state_file.read()
+
+        if len(data) < HEADER.size:
+            raise BaconUpdateException('%s is too short to be a Bacon update state file.' % path)
+        (magic, version, source_position, actor_count, title_count, credit_count, actor_strings_size,
+         title_strings_size) = HEADER.unpack_from(data)
+        if magic != STATE_MAGIC or version != STATE_VERSION:
+            raise BaconUpdateException('%s is not a version %s Bacon update state file.' % (path, STATE_VERSION))
+
+        try:
+            hops, parents, credit_offsets, credits, actor_offsets, actor_strings, title_offsets, title_strings = \
+                read_sections(data, HEADER.size, [(HOPS_TYPECODE, actor_count),
+                                                  (PARENT_TYPECODE, actor_count),
+                                                  (OFFSET_TYPECODE, actor_count + 1),
+                                                  (TARGET_TYPECODE, credit_count),
+                                                  (OFFSET_TYPECODE, actor_count + 1),
+                                                  ('B', actor_strings_size),
+                                                  (OFFSET_TYPECODE, title_count + 1),
+                                                  ('B', title_strings_size)])
+        except SnapshotException:
+            raise BaconUpdateException('%s is truncated.' % path)
+
+        actors = list(LabelTable(actor_strings, actor_offsets))
+        titles = list(LabelTable(title_strings, title_offsets))
+        actor_titles = {actor: [titles[credit] for credit in credits[credit_offsets[i]:credit_offsets[i + 1]]]
+                        for i, actor in enumerate(actors)}
+        distances = {actor: (hops[i], None if parents[i] == NOT_CONNECTED else actors[parents[i]])
+                     for i, actor in enumerate(actors) if hops[i] != NOT_CONNECTED}
+        return cls(actor_titles, actors[source_position], distances=distances)
+
+    @staticmethod
+    def _normalize(actor_titles):
+        if hasattr(actor_titles, 'items'):
+            actor_titles = actor_titles.items()
+        return {actor: set(titles) for actor, titles in actor_titles}
+
+    def _remove_credits(self, new_actor_titles):
+        """Remove the credits missing from 'new_actor_titles', returning (removed credits, departed actors).
+
+        An actor who has left the list keeps an empty set of titles until the update is finished.
+        """
+        films_to_actors = self.films_to_actors
+        removed_credits = []
+        departed_actors = []
+        for actor, titles in self.actor_titles.items():
+            new_titles = new_actor_titles.get(actor)
+            if new_titles is None:
+                departed_actors.append(actor)
+                new_titles = set()
+            lost_titles = titles - new_titles
+            for title in lost_titles:
+                cast = films_to_actors[title]
+                cast.discard(actor)
+                if not cast:
+                    del films_to_actors[title]
+                removed_credits.append((actor, title))
+            titles -= lost_titles
+        return removed_credits, departed_actors
+
+    def _add_credits(self, new_actor_titles):
+        """Add the credits of 'new_actor_titles' that are missing, returning the added credits."""
+        films_to_actors = self.films_to_actors
+        added_credits = []
+        for actor, titles in new_actor_titles.items():
+            old_titles = self.actor_titles.setdefault(actor, set())
+            for title in titles - old_titles:
+                films_to_actors.setdefault(title, set()).add(actor)
+                added_credits.append((actor, title))
+            old_titles |= titles
+        return added_credits
+
+    def _repair_deletions(self, removed_credits):
+        """Recompute the distances of the actors whose every shortest path used a removed credit."""
+        hops, parents = self._hops, self._parents
+        order = count()
+        candidates = []
+        # A removed credit cuts the link between its actor and the rest of the title's cast before
+        # the update, including the actors who lost the same title.
+        lost_casts = {}
+        for actor, title in removed_credits:
+            lost_casts.setdefault(title, []).append(actor)
+        for title, lost_cast in lost_casts.items():
+            old_cast = self.films_to_actors.get(title, set()).union(lost_cast)
+            for actor in lost_cast:
+                for co_star in old_cast:
+                    for near, far in ((actor, co_star), (co_star, actor)):
+                        if near in hops and far in hops and hops[far] == hops[near] + 1:
+                            heappush(candidates, (hops[far], next(order), far))
+
+        # Check candidates in order of distance, so that every actor one hop nearer to the source
+        # has already been checked. An actor is unaffected if any unaffected co-star is one hop
+        # nearer; otherwise the actors it led to must be checked too.
+        checked = set()
+        affected = set()
+        while candidates:
+            actor_hops, _, actor = heappop(candidates)
+            if actor in checked:
+                continue
+            checked.add(actor)
+            for co_star in self._co_stars(actor):
+                if co_star not in affected and hops.get(co_star) == actor_hops - 1:
+                    parents[actor] = co_star
+                    break
+            else:
+                affected.add(actor)
+                for co_star in self._co_stars(actor):
+                    if co_star not in checked and hops.get(co_star) == actor_hops + 1:
+                        heappush(candidates, (actor_hops + 1, next(order), co_star))
+
+        for actor in affected:
+            self._hops_before.setdefault(actor, hops.pop(actor))
+            del parents[actor]
+
+        # Search the affected actors again, starting from their best unaffected co-stars.
+        queue = []
+        for actor in affected:
+            for co_star in self._co_stars(actor):
+                if co_star in hops:
+                    heappush(queue, (hops[co_star] + 1, next(order), actor, co_star))
+        self._settle(queue, order, lambda co_star: co_star in affected and co_star not in hops)
+
+    def _repair_insertions(self, added_credits):
+        """Lower the distances of the actors that added credits bring nearer to the source."""
+        hops = self._hops
+        order = count()
+        queue = []
+        for actor, title in added_credits:
+            for co_star in self.films_to_actors[title]:
+                for near, far in ((actor, co_star), (co_star, actor)):
+                    if near in hops and hops[near] + 1 < hops.get(far, float('inf')):
+                        heappush(queue, (hops[near] + 1, next(order), far, near))
+        self._settle(queue, order, lambda co_star: True)
+
+    def _settle(self, queue, order, can_relax):
+        """Run Dijkstra's algorithm from a queue of (hops, order, actor, parent) entries.
+
+        Only co-stars for which 'can_relax' is true are considered, and an actor's distance only
+        ever decreases.
+        """
+        hops, parents = self._hops, self._parents
+        while queue:
+            actor_hops, _, actor, parent = heappop(queue)
+            if hops.get(actor, float('inf')) <= actor_hops:
+                continue
+            self._hops_before.setdefault(actor, hops.get(actor))
+            hops[actor] = actor_hops
+            parents[actor] = parent
+            for co_star in self._co_stars(actor):
+                if can_relax(co_star) and actor_hops + 1 < hops.get(co_star, float('inf')):
+                    heappush(queue, (actor_hops + 1, next(order), co_star, actor))
+
+
+def main():
+    arguments = docopt(__doc__)
+    actor_titles = _read_actor_file(arguments['<actor_list>'], workers=int(arguments['--workers']))
+    if arguments['--init']:
+        incremental = IncrementalBaconIndex(actor_titles, BACON)
+        print('Indexed %s actors.' % len(incremental.actor_titles))
+    else:
+        incremental = IncrementalBaconIndex.load(arguments['--state'])
+        changes = incremental.update(actor_titles)
+        print('Added %s and removed %s credits; %s actors changed distance.' % (
+            changes['credits added'], changes['credits removed'], changes['hops changed']))
+
+    incremental.save(arguments['--state'])
+    if arguments['--index']:
+        incremental.to_index().save(arguments['--index'])
+
+
+if __name__ == "__main__":
+    main()
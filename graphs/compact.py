@@ -0,0 +1,220 @@
+from array import array
+import logging
+from graphs import instrumentation
+from graphs.primitives import Graph, GraphException
+
+_log = logging.getLogger(__name__)
+
+# Typecodes for the CSR arrays. Offsets can exceed 2**31 on dense graphs (the actor graph has
+# billions of co-star pairs), but node indices comfortably fit in 32 bits.
+OFFSET_TYPECODE = 'q'
+TARGET_TYPECODE = 'i'
+
+
+class CompactGraph:
+    """A read-only graph stored in compressed sparse row (CSR) form.
+
+    Nodes are identified by their index in `labels`. The neighbours of node i are
+    targets[offsets[i]:offsets[i + 1]]. Undirected edges are stored once in each direction,
+    so `targets` holds two entries per undirected edge.
+    """
+    def __init__(self, labels, offsets, targets, edge_labels=None, directed=False, index=None):
+        """The arrays may be any integer sequences, such as arrays or memoryviews.
+
+        'index' maps each label to the first node carrying it, to match Graph.get_node_by_label.
+        If not given, a dict is built from 'labels'.
+        """
+        if len(offsets) != len(labels) + 1:
+            raise GraphException('Expected %s offsets, got %s' % (len(labels) + 1, len(offsets)))
+        self.labels = labels
+        self.offsets = offsets
+        self.targets = targets
+        self.edge_labels = edge_labels
+        self.directed = directed
+
+        if index is None:
+            index = {}
+            for i, label in enumerate(labels):
+                index.setdefault(label, i)
+        self._index = index
+
+    @classmethod
+    def from_graph(cls, graph, edge_labels=False):
+        """Build a CompactGraph from a primitives.Graph.
+
+        Neighbour order matches the order of each node's edge list, so traversals visit nodes in the
+        same order as the equivalent Graph traversal. Graphs mixing directed and undirected edges
+        are not supported.
+        """
+        directed_flags = set(edge.directed for edge in graph.edges)
+        if len(directed_flags) > 1:
+            raise GraphException('Cannot compact a graph with both directed and undirected edges.')
+        directed = directed_flags == {True}
+
+        node_index = {node: i for i, node in enumerate(graph.nodes)}
+        labels = [node.label for node in graph.nodes]
+        offsets = array(OFFSET_TYPECODE, [0])
+        targets = array(TARGET_TYPECODE)
+        slot_labels = [] if edge_labels else None
+
+        for node in graph.nodes:
+            # outgoing_edges holds every undirected edge, and directed edges only at their tail.
+            for edge in node.outgoing_edges:
+                other_node = edge.head if edge.tail is node else edge.tail
+                targets.append(node_index[other_node])
+                if edge_labels:
+                    slot_labels.append(edge.label)
+            offsets.append(len(targets))
+
+        _log.info('Compacted graph to %s nodes, %s adjacency entries', len(labels), len(targets))
+        return cls(labels, offsets, targets, edge_labels=slot_labels, directed=directed)
+
+    def to_graph(self):
+        """Expand back into a primitives.Graph."""
+        graph = Graph()
+        graph.add_nodes(self.labels)
+
+        edges = []
+        for i in range(len(self.labels)):
+            self_loops = 0
+            for slot in range(self.offsets[i], self.offsets[i + 1]):
+                j = self.targets[slot]
+                if not self.directed:
+                    # Each undirected edge is stored at both ends; only emit it from the lower index.
+                    # Self-loops appear twice in the same node's list.
+                    if j < i:
+                        continue
+                    if j == i:
+                        self_loops += 1
+                        if self_loops % 2 == 0:
+                            continue
+                edge_label = self.edge_labels[slot] if self.edge_labels is not None else None
+                edges.append((self.labels[i], self.labels[j], edge_label))
+        graph.add_edges(edges, directed=self.directed)
+
+        return graph
+
+    @property
+    def node_count(self):
+        return len(self.labels)
+
+    @property
+    def edge_count(self):
+        """Number of edges, counting each undirected edge once."""
+        return len(self.targets) if self.directed else len(self.targets) // 2
+
+    def get_index_by_label(self, label):
+        """Get the index of the first node with the specified label."""
+        try:
+            return self._index[label]
+        except KeyError:
+            raise GraphException('No node with label "%s"' % label)
+
+    def neighbours(self, index):
+        """Get the indices of the nodes adjacent to the node at 'index'."""
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def breadth_first_search(self, start, end=None):
+        """Perform a breadth-first search for a path from node index 'start' to 'end'.
+
+        Returns the same (found, explored) pair as Graph.breadth_first_search, with node indices
+        in place of Node objects.
+        """
+        offsets = self.offsets
+        targets = self.targets
+        layers = array('i', [-1]) * len(self.labels)
+        layers[start] = 0
+
+        # The explored list doubles as the frontier queue: nodes are appended when discovered and
+        # the read position trails behind.
+        queue = [start]
+        position = 0
+        found = False
+
+        while position < len(queue) and not found:
+            node = queue[position]
+            position += 1
+            if node == end:
+                found = True
+            next_layer = layers[node] + 1
+            for slot in range(offsets[node], offsets[node + 1]):
+                other_node = targets[slot]
+                if layers[other_node] < 0:
+                    layers[other_node] = next_layer
+                    queue.append(other_node)
+
+        explored = [(node, layers[node]) for node in queue[:position]]
+        if instrumentation.hook is not None:
+            self._record_search('compact bfs', queue[:position],
+                                instrumentation.count_layers(layer for _, layer in explored))
+        return found, explored
+
+    def _record_search(self, name, expanded, frontier_sizes):
+        """Report a finished search to the attached instrumentation, given the nodes it expanded."""
+        offsets = self.offsets
+        instrumentation.hook.record_search(name, len(expanded),
+                                           sum(offsets[node + 1] - offsets[node] for node in expanded),
+                                           frontier_sizes)
+
+    def shortest_path(self, start, end):
+        """Find a shortest path from node index 'start' to 'end' by BFS.
+
+        Returns the list of node indices on the path, or [] if there is none. The search stops as
+        soon as 'end' is discovered.
+        """
+        offsets = self.offsets
+        targets = self.targets
+        parents = array('i', [-1]) * len(self.labels)
+        parents[start] = start
+        queue = [start]
+        position = 0
+
+        while position < len(queue) and parents[end] < 0:
+            node = queue[position]
+            position += 1
+            for slot in range(offsets[node], offsets[node + 1]):
+                other_node = targets[slot]
+                if parents[other_node] < 0:
+                    parents[other_node] = node
+                    queue.append(other_node)
+
+        if instrumentation.hook is not None:
+            # Parents don't record layers, so no frontier sizes are reported.
+            self._record_search('compact shortest path', queue[:position], [])
+
+        if parents[end] < 0:
+            return []
+        path = [end]
+        while path[-1] != start:
+            path.append(parents[path[-1]])
+        path.reverse()
+        return path
+
+    def bfs_connected_regions(self):
+        """Determine the connected regions of an undirected graph, as lists of node indices."""
+        offsets = self.offsets
+        targets = self.targets
+        explored = bytearray(len(self.labels))
+        regions = []
+
+        for start in range(len(self.labels)):
+            if explored[start]:
+                continue
+            explored[start] = 1
+            region = [start]
+            position = 0
+            while position < len(region):
+                node = region[position]
+                position += 1
+                for slot in range(offsets[node], offsets[node + 1]):
+                    other_node = targets[slot]
+                    if not explored[other_node]:
+                        explored[other_node] = 1
+                        region.append(other_node)
+            regions.append(region)
+
+        _log.info('Found %s regions', len(regions))
+        return regions
+
+    def __repr__(self):
+        return 'CompactGraph(nodes=%s, edges=%s)' % (self.node_count, self.edge_count)
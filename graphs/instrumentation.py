@@ -0,0 +1,98 @@
+"""Optional instrumentation for the traversal and parsing hot loops.
+
+Instrumented code reads the module-level 'hook' once per call, and only reports to it when a Stats
+object is attached. Counts are derived after each loop finishes, from what it already built (the
+explored list, the BFS tree), so the loops themselves are untouched and an unattached hook costs a
+single attribute lookup per call.
+"""
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+import logging
+from time import perf_counter
+
+_log = logging.getLogger(__name__)
+
+# The attached Stats object, or None.
+hook = None
+
+
+class Stats:
+    """Counters, per-layer frontier sizes and phase timings collected from instrumented code."""
+    def __init__(self):
+        self.counters = Counter()
+        # Maps a search name to the number of nodes in each layer, summed over every search.
+        self.layer_sizes = {}
+        # Maps a phase name to the seconds spent in it, in the order phases were first entered.
+        self.phase_times = {}
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def record_search(self, name, nodes_expanded, edges_scanned, frontier_sizes):
+        """Record one search, given the number of nodes in the frontier at each layer."""
+        self.counters[name + ' searches'] += 1
+        self.counters[name + ' nodes expanded'] += nodes_expanded
+        self.counters[name + ' edges scanned'] += edges_scanned
+        sizes = self.layer_sizes.setdefault(name, [])
+        if len(frontier_sizes) > len(sizes):
+            sizes.extend([0] * (len(frontier_sizes) - len(sizes)))
+        for layer, size in enumerate(frontier_sizes):
+            sizes[layer] += size
+
+    def add_time(self, name, seconds):
+        self.phase_times[name] = self.phase_times.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        """Time the body of a with statement, adding it to the phase 'name'."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, perf_counter() - start)
+
+    def report(self):
+        """Format the collected statistics as a list of lines."""
+        lines = ['%s: %s' % (name, value) for name, value in sorted(self.counters.items())]
+        for name, sizes in self.layer_sizes.items():
+            lines.append('%s frontier sizes: %s' % (name, ' '.join(str(size) for size in sizes)))
+        for name, seconds in self.phase_times.items():
+            lines.append('%s time: %.3fs' % (name, seconds))
+        return lines
+
+
+def count_layers(layers):
+    """Turn the layer number of each node in a search into the number of nodes in each layer."""
+    sizes = []
+    for layer, size in Counter(layers).items():
+        if layer >= len(sizes):
+            sizes.extend([0] * (layer + 1 - len(sizes)))
+        sizes[layer] = size
+    return sizes
+
+
+def attach(stats):
+    """Send instrumentation from every instrumented function to 'stats'."""
+    global hook
+    hook = stats
+
+
+def detach():
+    global hook
+    hook = None
+
+
+@contextmanager
+def attached(stats):
+    """Attach 'stats' for the body of a with statement, restoring the previous hook afterwards."""
+    global hook
+    previous, hook = hook, stats
+    try:
+        yield stats
+    finally:
+        hook = previous
+
+
+def phase(name):
+    """Time a phase on the attached Stats, or do nothing if none is attached."""
+    return nullcontext() if hook is None else hook.phase(name)
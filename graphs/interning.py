@@ -0,0 +1,48 @@
+import logging
+
+_log = logging.getLogger(__name__)
+
+
+class InterningException(Exception):
+    pass
+
+
+class Interner:
+    """Gives each distinct string a dense integer ID, in order of first appearance.
+
+    Graphs built on the IDs store one string per distinct name, instead of a string for every
+    occurrence, and hash and compare small ints while they are built and searched. IDs are
+    resolved back to strings with interner[id], for output.
+    """
+    def __init__(self, strings=()):
+        self.strings = []
+        self._ids = {}
+        for string in strings:
+            self.intern(string)
+
+    def intern(self, string):
+        """Get the ID of 'string', giving it the next ID if it hasn't been seen before."""
+        string_id = self._ids.get(string)
+        if string_id is None:
+            string_id = self._ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+    def get_id(self, string):
+        """Get the ID of a string that has already been interned."""
+        try:
+            return self._ids[string]
+        except KeyError:
+            raise InterningException('"%s" has not been interned.' % string)
+
+    def __getitem__(self, string_id):
+        return self.strings[string_id]
+
+    def __contains__(self, string):
+        return string in self._ids
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __repr__(self):
+        return 'Interner(strings=%s)' % len(self.strings)
@@ -3,17 +3,72 @@
 Bacon index calculator, using the IMDB movie graph.
 
 Usage:
-    kevin_bacon.py <actor_name>
+    kevin_bacon.py [options] <actor_name>
+    kevin_bacon.py [options] --build-index
+    kevin_bacon.py [options] --distribution
+    kevin_bacon.py [options] --build-snapshot=<file>
+    kevin_bacon.py [options] --snapshot=<file> <actor_name>
+    kevin_bacon.py [options] --batch=<file>
+
+Options:
+    --index=<file>           Bacon number index, bacon.idx if not given. Queries use it instead of
+                             parsing the actor list when it exists, except that the default index
+                             is skipped when credit filters are given.
+    --build-index            Parse the actor list and save the Bacon number of every actor to the index.
+    --distribution           Print the number of actors with each Bacon number, from the index.
+    --workers=<n>            Number of processes used to parse the actor list [default: 1].
+    --bipartite              Join actors to title nodes instead of joining every pair of co-stars.
+    --build-snapshot=<file>  Parse the actor list and save the graph as a binary snapshot.
+    --snapshot=<file>        Answer the query from a graph snapshot instead of the actor list.
+    --batch=<file>           Answer a query for each actor named in this file, one per line. A file
+                             name of - reads the names from standard input.
+    --format=<format>        Output format of batch queries, csv or jsonl [default: csv].
+    --exclude=<types>        Drop credits of these comma-separated media types while parsing: film,
+                             tv-movie, video, video-game, series or episode.
+    --years=<range>          Keep only credits for titles from a range of years, such as 1980-1999,
+                             1980- or -1999. Titles of unknown year are dropped.
+    --max-billing=<n>        Keep only credits billed at position n or better. Unbilled credits are dropped.
+    --stats                  Print counts of the work done by parsing and searching, and the time per phase.
 """
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from io import StringIO
+from itertools import repeat
 import logging
+import mmap
+import os
+import json
 import re
+import sys
+from time import perf_counter
 from docopt import docopt
-from graphs.primitives import Graph
+from graphs import instrumentation
+from graphs.bacon_index import BaconIndex, BaconIndexException
+from graphs.interning import Interner, InterningException
+from graphs.primitives import Graph, GraphException
+from graphs.snapshot import load_snapshot, write_snapshot
 
 ACTOR_FILE = 'actors.list'
+INDEX_FILE = 'bacon.idx'
 BACON = 'Bacon, Kevin (I)'
+# Actor records are read in blocks of this many characters.
+BLOCK_SIZE = 1 << 20
+# The actors list is terminated by a line of dashes.
+END_OF_LIST = '-' * 10
+# Title node labels in the bipartite graph start with a tab. ACTOR_RE never matches a tab in an actor
+# name, so title labels can't collide with actor labels, and both stay plain strings.
+TITLE_PREFIX = '\t'
+BATCH_FORMATS = ('csv', 'jsonl')
+UNKNOWN_ACTOR = 'Unknown actor.'
+# Split the list into this many shards per worker, so that uneven shards even out.
+SHARDS_PER_WORKER = 4
 ACTOR_RE = re.compile('([^\t]+)\t+([^\t]+)')
 TITLE_RE = re.compile('([\w .,"&!?\']+) (\(\d+\))')
+# The year of a title, with its optional roman numeral, followed by an optional TV movie, video or
+# video game marker.
+CREDIT_RE = re.compile(r'\((\d{4}|\?{4})(?:/[IVXLCDM]+)?\)(?: \((TV|V|VG)\))?')
+MEDIA_TYPES = ('film', 'tv-movie', 'video', 'video-game', 'series', 'episode')
+MEDIA_MARKERS = {None: 'film', 'TV': 'tv-movie', 'V': 'video', 'VG': 'video-game'}
 
 _log = logging.getLogger(__name__)
 
@@ -26,6 +81,8 @@ def _seek_to_actors(file):
         _log.debug('Read "%s"', line)
         if line == "THE ACTORS LIST\n":
             seeking = False
+        elif not line:
+            raise BaconException('Reached end of file before the actors list.')
 
     file.readline()  # Underline
     file.readline()  # Blank line
@@ -39,20 +96,125 @@ def _seek_to_actors(file):
 def _read_next_actor(file):
     """Read and return the next actor from the file.
 
-    Assumes that actors are delimited by a blank line.
+    Assumes that actors are delimited by blank lines. Returns (None, None) at the rule that ends
+    the list, or at the end of the file.
     """
-    actor_lines = [file.readline()]
+    first_line = file.readline()
+    while first_line == '\n':
+        first_line = file.readline()
+    if not first_line or first_line.startswith(END_OF_LIST):
+        return None, None
+    actor_lines = [first_line]
     next_line = file.readline()
 
-    while next_line != '\n':
+    while next_line and next_line != '\n':
         actor_lines.append(next_line)
         next_line = file.readline()
 
     return _format_actor_lines(actor_lines)
 
 
-def _format_actor_lines(lines):
-    """Parse the text of an Actor entry.
+def _read_records(file, block_size=BLOCK_SIZE):
+    """Yield the lines of each blank-line delimited record in 'file', reading it in large blocks."""
+    leftover = ''
+    block = file.read(block_size)
+
+    while block:
+        records = (leftover + block).split('\n\n')
+        # The last record may continue into the next block.
+        leftover = records.pop()
+        for record in records:
+            record = record.strip('\n')
+            if record:
+                yield record.split('\n')
+        block = file.read(block_size)
+
+    leftover = leftover.strip('\n')
+    if leftover:
+        yield leftover.split('\n')
+
+
+def _iter_actors(file, block_size=BLOCK_SIZE, credit_filter=None):
+    """Parse an actors list file object, yielding an (actor, titles) tuple for each actor.
+
+    Stops at the rule that ends the list, or at the end of the file. Credits rejected by
+    'credit_filter' are left out of the titles, but their lines are still counted as parsed.
+    """
+    hook = instrumentation.hook
+    _seek_to_actors(file)
+    for lines in _read_records(file, block_size):
+        if lines[0].startswith(END_OF_LIST):
+            _log.debug('Reached end of actors list.')
+            return
+        if hook is not None:
+            hook.count('lines parsed', len(lines))
+        yield _format_actor_lines(lines, credit_filter)
+
+
+class CreditFilter:
+    """Decides which credits to keep while parsing the actor list, from the raw text of each credit.
+
+    'exclude_media' is a collection of MEDIA_TYPES to drop. 'min_year' and 'max_year' bound the
+    year of the title, inclusively, and drop titles of unknown year. 'max_billing' keeps only
+    credits billed at that position or better, and drops unbilled credits.
+    """
+    def __init__(self, exclude_media=(), min_year=None, max_year=None, max_billing=None):
+        self.exclude_media = frozenset(exclude_media)
+        unknown_media = self.exclude_media.difference(MEDIA_TYPES)
+        if unknown_media:
+            raise BaconException('Unknown media types %s; expected some of %s.' %
+                                 (', '.join(sorted(unknown_media)), ', '.join(MEDIA_TYPES)))
+        self.min_year = min_year
+        self.max_year = max_year
+        self.max_billing = max_billing
+
+    def accepts(self, credit):
+        """Whether to keep a credit, given its text from the list, such as 'Footloose (1984)  [Ren]  <1>'."""
+        if self.max_billing is not None:
+            # The billing position is always the last thing on the line.
+            if not credit.endswith('>'):
+                return False
+            try:
+                billing = int(credit[credit.rindex('<') + 1:-1])
+            except ValueError:
+                return False
+            if billing > self.max_billing:
+                return False
+
+        if not self.exclude_media and self.min_year is None and self.max_year is None:
+            return True
+        match = CREDIT_RE.search(credit)
+        if match is None:
+            # Leave malformed credits for the title parser to report.
+            return True
+        year, marker = match.groups()
+
+        if self.exclude_media:
+            if credit.startswith('"'):
+                # A series title is quoted, and an episode of it follows in braces.
+                media = 'episode' if '{' in credit else 'series'
+            else:
+                media = MEDIA_MARKERS[marker]
+            if media in self.exclude_media:
+                return False
+
+        if self.min_year is not None or self.max_year is not None:
+            if not year.isdigit():
+                return False
+            year = int(year)
+            if self.min_year is not None and year < self.min_year:
+                return False
+            if self.max_year is not None and year > self.max_year:
+                return False
+        return True
+
+    def __repr__(self):
+        return 'CreditFilter(exclude_media=%s, min_year=%s, max_year=%s, max_billing=%s)' % (
+            sorted(self.exclude_media), self.min_year, self.max_year, self.max_billing)
+
+
+def _format_actor_lines(lines, credit_filter=None):
+    """Parse the text of an Actor entry, leaving out the credits that 'credit_filter' rejects.
 
     Expects the following input format:
 
@@ -79,19 +241,19 @@ def _format_actor_lines(lines):
                      variety/comedy specials released on video, or
                      self-help/physical fitness videos)
     """
-    actor_line = lines.pop(0)
-    _log.debug('Parsing actor line %s', actor_line)
+    actor_line = lines[0]
     match = ACTOR_RE.match(actor_line)
     if match is None:
         raise BaconException('Failed to match actor on line: %s' %actor_line)
     actor, first_role = match.groups()
 
-    _log.debug('Got actor, first_role = %s, %s', actor, first_role)
-    title_strings = [first_role] + [title.strip() for title in lines]
     titles = []
 
     # Extract the titles from the list of title input strings
-    for title_string in title_strings:
+    for i, line in enumerate(lines):
+        title_string = first_role if i == 0 else line.strip()
+        if credit_filter is not None and not credit_filter.accepts(title_string):
+            continue
         match = TITLE_RE.match(title_string)
         if match is None:
             raise BaconException('Failed to match title on line: %s' % title_string)
@@ -101,20 +263,24 @@ def _format_actor_lines(lines):
 
 
 def _create_actor_graph(actor_titles):
+    """Build the co-star graph from a dict of actor titles, or an iterable of (actor, titles) tuples."""
     graph = Graph()
     films_to_actors = {}
 
-    for actor, titles in actor_titles.items():
-        _log.debug('Processing actor "%s"', actor)
+    if hasattr(actor_titles, 'items'):
+        actor_titles = actor_titles.items()
+
+    for actor, titles in actor_titles:
         # First add a node for the actor
         graph.add_node_by_label(actor)
+        co_star_edges = []
 
         # Next add edges to any actors with matching titles
         for title in titles:
             if title in films_to_actors:
                 # We've already got at least one actor from this title. Add edges.
                 for other_actor in films_to_actors[title]:
-                    graph.add_edge_by_label(actor, other_actor, edge_label=title)
+                    co_star_edges.append((actor, other_actor, title))
 
                 # Also add this actor to the film's actor list, in case further matching actors are found.
                 films_to_actors[title].append(actor)
@@ -122,39 +288,445 @@ def _create_actor_graph(actor_titles):
                 # This film hasn't been seen before. Start a new actor list.
                 films_to_actors[title] = [actor]
 
+        graph.add_edges(co_star_edges)
+
     return graph
 
 
-def _find_hops_to_kevin(actor_titles, target_actor):
-    graph = _create_actor_graph(actor_titles)
-    _log.debug('Build graph %s', graph)
-    kevin_node = graph.get_node_by_label(BACON)
-    target_node = graph.get_node_by_label(target_actor)
+def _create_bipartite_graph(actor_titles, title_label=None):
+    """Build a graph of actor and title nodes, with an edge from each actor to each of their titles.
 
-    found, explored = graph.breadth_first_search(kevin_node, target_node)
+    Unlike the co-star graph, the number of edges is linear in the number of credits. Title nodes
+    are labelled by calling 'title_label' once per title, _title_label by default, and every edge
+    is labelled with its title.
+    """
+    if title_label is None:
+        title_label = _title_label
+    graph = Graph()
+    title_labels = {}
 
-    last_explored = explored[len(explored) - 1]
-    _log.debug('Last explored: %s', last_explored)
-    _, hops = last_explored
-    return hops
+    if hasattr(actor_titles, 'items'):
+        actor_titles = actor_titles.items()
 
+    for actor, titles in actor_titles:
+        graph.add_node_by_label(actor)
+        membership_edges = []
 
-def main():
-    arguments = docopt(__doc__, version='0.1.0')
-    target_actor = arguments['<actor_name>']
+        for title in titles:
+            label = title_labels.get(title)
+            if label is None:
+                label = title_labels[title] = title_label(title)
+                graph.add_node_by_label(label)
+            membership_edges.append((actor, label, title))
+
+        graph.add_edges(membership_edges)
+
+    return graph
+
+
+def _intern_actor_titles(actor_titles, interner):
+    """Pass (actor, titles) tuples through, with every actor and title replaced by its ID in 'interner'."""
+    if hasattr(actor_titles, 'items'):
+        actor_titles = actor_titles.items()
+
+    intern = interner.intern
+    for actor, titles in actor_titles:
+        yield intern(actor), [intern(title) for title in titles]
+
+
+def _create_interned_graph(actor_titles, interner, bipartite=False):
+    """Build either graph model with every actor and title label replaced by its ID in 'interner'.
+
+    Node and edge labels are ints, to be resolved with the interner for output. Title nodes in the
+    bipartite graph are labelled with the ID of their _title_label.
+    """
+    actor_titles = _intern_actor_titles(actor_titles, interner)
+    if bipartite:
+        return _create_bipartite_graph(actor_titles, lambda title: interner.intern(_title_label(interner[title])))
+    return _create_actor_graph(actor_titles)
+
+
+def _get_actor_node(graph, interner, actor):
+    """Get the node of 'actor' in a graph built by _create_interned_graph."""
+    try:
+        return graph.get_node_by_label(interner.get_id(actor))
+    except (GraphException, InterningException):
+        raise GraphException('No node with label "%s"' % actor)
+
+
+def _title_label(title):
+    return TITLE_PREFIX + title
+
+
+def _is_title_label(label):
+    return label.startswith(TITLE_PREFIX)
+
+
+def _find_hops_to_kevin(actor_titles, target_actor, bipartite=False):
+    """Count the hops from Kevin Bacon to 'target_actor', or return None if they aren't connected."""
+    chain = _find_path_to_kevin(actor_titles, target_actor, bipartite=bipartite)
+    return None if chain is None else len(chain) // 2
 
-    with open(ACTOR_FILE, 'r', encoding='latin1') as actor_file:
-        actor_titles = {}
+
+def _find_path_to_kevin(actor_titles, target_actor, bipartite=False):
+    """Find a shortest chain from 'target_actor' to Kevin Bacon, or return None if they aren't connected.
+
+    The chain alternates actors with the titles that link them: [actor, title, actor, ..., BACON].
+    """
+    interner = Interner()
+    with instrumentation.phase('build graph'):
+        graph = _create_interned_graph(actor_titles, interner, bipartite=bipartite)
+    _log.debug('Build graph %s', graph)
+    kevin_node = _get_actor_node(graph, interner, BACON)
+    target_node = _get_actor_node(graph, interner, target_actor)
+
+    with instrumentation.phase('search'):
+        nodes, edges = graph.bidirectional_path(target_node, kevin_node)
+    _log.debug('Path: %s', nodes)
+    if not nodes:
+        return None
+    return _linking_chain([interner[node.label] for node in nodes], [interner[edge.label] for edge in edges])
+
+
+def _linking_chain(node_labels, edge_labels):
+    """Turn the labels along a path through either graph model into a list alternating actors and titles.
+
+    Both models label every edge with its title. In the co-star graph each edge joins two actors;
+    in the bipartite graph a title node sits between them, and its label only carries the prefix.
+    """
+    chain = [node_labels[0]]
+    for previous_label, edge_label, label in zip(node_labels, edge_labels, node_labels[1:]):
+        if _is_title_label(label):
+            chain.append(edge_label)
+        else:
+            if not _is_title_label(previous_label):
+                chain.append(edge_label)
+            chain.append(label)
+    return chain
+
+
+def _find_actors_span(path):
+    """Find the byte range of the actor records in the list at 'path'."""
+    with open(path, 'r', encoding='latin1') as actor_file:
         _seek_to_actors(actor_file)
-        actor, titles = _read_next_actor(actor_file)
+        # Latin-1 has one byte per character, so the text position is also the byte offset.
+        start = actor_file.tell()
+
+    with open(path, 'rb') as actor_file, mmap.mmap(actor_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        end_of_list = END_OF_LIST.encode('latin1')
+        if data[start:start + len(end_of_list)] == end_of_list:
+            return start, start
+        end = data.find(b'\n\n' + end_of_list, start)
+        return start, (len(data) if end < 0 else end + 2)
+
+
+def _shard_actor_file(path, count):
+    """Split the actor records in the list at 'path' into at most 'count' (start, end) byte ranges.
+
+    Every range starts at the beginning of an actor record, just after a blank line.
+    """
+    start, end = _find_actors_span(path)
+    boundaries = [start]
+
+    with open(path, 'rb') as actor_file, mmap.mmap(actor_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for shard in range(1, count):
+            position = max(start + (end - start) * shard // count, boundaries[-1])
+            separator = data.find(b'\n\n', position, end)
+            if separator < 0:
+                break
+            boundaries.append(separator + 2)
+    boundaries.append(end)
+
+    return [(shard_start, shard_end) for shard_start, shard_end in zip(boundaries, boundaries[1:])
+            if shard_start < shard_end]
+
+
+def _parse_actor_shard(path, start, end, credit_filter=None):
+    """Parse the actor records in the byte range [start, end) of the list at 'path'.
+
+    Returns the (actor, titles) tuples and the number of lines parsed, counted before any credits
+    are filtered out, since the workers can't record stats themselves.
+    """
+    with open(path, 'rb') as actor_file:
+        actor_file.seek(start)
+        text = actor_file.read(end - start).decode('latin1')
 
-        while actor:
-            actor_titles[actor] = titles
-            actor, titles = _read_next_actor(actor_file)
+    actors = []
+    line_count = 0
+    for lines in _read_records(StringIO(text)):
+        line_count += len(lines)
+        actors.append(_format_actor_lines(lines, credit_filter))
+    return actors, line_count
 
-    hops = _find_hops_to_kevin(actor_titles, target_actor)
 
-    print('Found path in %s hops.' % hops)
+def find_actor_path(graph, actor):
+    """Find the actors on a shortest path from 'actor' to Kevin Bacon in a CompactGraph, co-star or bipartite.
+
+    Returns [] if they aren't connected. Raises GraphException if 'actor' isn't an actor in the
+    graph, and BaconException if Kevin Bacon isn't.
+    """
+    target = graph.get_index_by_label(actor)
+    if _is_title_label(actor):
+        raise GraphException('No node with label "%s"' % actor)
+    try:
+        source = graph.get_index_by_label(BACON)
+    except GraphException:
+        raise BaconException('%s is not in the graph.' % BACON)
+
+    path = graph.shortest_path(source, target)
+    # Only report actors, so that title nodes in a bipartite graph don't add hops.
+    return [graph.labels[index] for index in reversed(path) if not _is_title_label(graph.labels[index])]
+
+
+def read_actor_graph(path=ACTOR_FILE, bipartite=False, workers=1, credit_filter=None):
+    """Parse the actor list at 'path' into a co-star graph, or a bipartite graph of actors and titles."""
+    create_graph = _create_bipartite_graph if bipartite else _create_actor_graph
+    return create_graph(_read_actor_file(path, workers=workers, credit_filter=credit_filter))
+
+
+def _find_hops_in_snapshot(graph, target_actor):
+    """Count the hops from Kevin Bacon to 'target_actor' in a CompactGraph, co-star or bipartite."""
+    actors = find_actor_path(graph, target_actor)
+    return len(actors) - 1 if actors else None
+
+
+def _read_actor_file(path=ACTOR_FILE, workers=1, credit_filter=None):
+    """Stream (actor, titles) tuples from the actor list at 'path'.
+
+    With more than one worker, the list is split into shards at record boundaries and parsed by a
+    pool of processes. Actors are still yielded in file order. Credits rejected by 'credit_filter'
+    are dropped as they are parsed, so an actor may be yielded with fewer titles, or none.
+    """
+    actor_titles = _parse_actor_file(path, workers, credit_filter)
+    if instrumentation.hook is not None:
+        actor_titles = _instrumented_actors(actor_titles, instrumentation.hook)
+    return actor_titles
+
+
+def _parse_actor_file(path, workers, credit_filter=None):
+    """Parse the actor list at 'path' in this process, or with a pool of 'workers' processes."""
+    if workers <= 1:
+        with open(path, 'r', encoding='latin1') as actor_file:
+            yield from _iter_actors(actor_file, credit_filter=credit_filter)
+        return
+
+    shards = _shard_actor_file(path, workers * SHARDS_PER_WORKER)
+    _log.info('Parsing %s shards with %s workers', len(shards), workers)
+    starts = [start for start, _ in shards]
+    ends = [end for _, end in shards]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for actors, line_count in executor.map(_parse_actor_shard, repeat(path), starts, ends, repeat(credit_filter)):
+            if instrumentation.hook is not None:
+                instrumentation.hook.count('lines parsed', line_count)
+            yield from actors
+
+
+def _instrumented_actors(actor_titles, stats):
+    """Pass (actor, titles) tuples through, counting them and timing the parser that produces them.
+
+    The credits counted are the titles kept, after any credit filter has dropped some of them; the
+    parsers count the lines parsed. The parse time is also included in the time of whichever phase consumes the tuples.
+    """
+    actor_titles = iter(actor_titles)
+    while True:
+        start = perf_counter()
+        try:
+            actor, titles = next(actor_titles)
+        except StopIteration:
+            return
+        finally:
+            stats.add_time('parse', perf_counter() - start)
+        stats.count('actors parsed')
+        stats.count('credits kept', len(titles))
+        yield actor, titles
+
+
+def _build_bacon_index(actor_titles, bipartite=False):
+    """Compute the Bacon number of every actor with a single BFS."""
+    interner = Interner()
+    with instrumentation.phase('build graph'):
+        graph = _create_interned_graph(actor_titles, interner, bipartite=bipartite)
+    source_id = _get_actor_node(graph, interner, BACON).label
+    with instrumentation.phase('search'):
+        if bipartite:
+            actor_nodes = [node for node in graph.nodes if not _is_title_label(interner[node.label])]
+            index = BaconIndex.build(graph, source_id, nodes=actor_nodes, layer_step=2)
+        else:
+            index = BaconIndex.build(graph, source_id)
+    return BaconIndex([interner[label] for label in index.labels], index.hops, index.parents)
+
+
+def _read_actor_names(file):
+    """Read actor names from a file object, one per line, skipping blank lines."""
+    return [line.rstrip('\r\n') for line in file if line.strip()]
+
+
+def _batch_hops(actor_titles, actors, bipartite=False):
+    """Yield an (actor, hops, error) tuple for each of 'actors', from a single BFS from Kevin Bacon.
+
+    The search stops as soon as every known actor has been reached. Hops is None for actors who
+    aren't connected, and error is UNKNOWN_ACTOR for names that aren't in the list.
+    """
+    interner = Interner()
+    with instrumentation.phase('build graph'):
+        graph = _create_interned_graph(actor_titles, interner, bipartite=bipartite)
+
+    nodes = {}
+    for actor in actors:
+        if _is_title_label(actor):
+            continue
+        try:
+            nodes[actor] = _get_actor_node(graph, interner, actor)
+        except GraphException:
+            pass
+
+    with instrumentation.phase('search'):
+        tree = graph.breadth_first_tree(_get_actor_node(graph, interner, BACON), targets=nodes.values())
+
+    # Every hop between actors passes through a title node in the bipartite graph.
+    layer_step = 2 if bipartite else 1
+    for actor in actors:
+        node = nodes.get(actor)
+        if node is None:
+            yield actor, None, UNKNOWN_ACTOR
+        elif node in tree:
+            yield actor, tree[node][0] // layer_step, None
+        else:
+            yield actor, None, None
+
+
+def _batch_hops_from_index(index, actors):
+    """Yield an (actor, hops, error) tuple for each of 'actors', looked up in a BaconIndex."""
+    for actor in actors:
+        try:
+            yield actor, index.get_hops(actor), None
+        except BaconIndexException:
+            yield actor, None, UNKNOWN_ACTOR
+
+
+def _write_batch_results(results, output, format='csv'):
+    """Write (actor, hops, error) tuples to 'output' as CSV or JSON Lines, as they are produced.
+
+    The format is checked before any results are consumed, so that a lazy search never starts.
+    """
+    if format not in BATCH_FORMATS:
+        raise BaconException('Unknown batch format "%s"; expected one of %s.' % (format, ', '.join(BATCH_FORMATS)))
+
+    if format == 'csv':
+        writer = csv.writer(output)
+        writer.writerow(['actor', 'hops', 'error'])
+        for actor, hops, error in results:
+            writer.writerow([actor, '' if hops is None else hops, error or ''])
+    else:
+        for actor, hops, error in results:
+            record = {'actor': actor, 'hops': hops}
+            if error:
+                record['error'] = error
+            output.write(json.dumps(record) + '\n')
+
+
+def _print_hops(hops):
+    if hops is None:
+        print('No path found.')
+    else:
+        print('Found path in %s hops.' % hops)
+
+
+def _print_path(chain):
+    """Print the number of hops in an [actor, title, actor, ...] chain, and the title linking each pair."""
+    if chain is None:
+        _print_hops(None)
+        return
+    _print_hops(len(chain) // 2)
+    for actor, title, other_actor in zip(chain[::2], chain[1::2], chain[2::2]):
+        print('%s was in %s with %s.' % (actor, title, other_actor))
+
+
+def _credit_filter_from_arguments(arguments):
+    """Build a CreditFilter from the command line options, or return None if none were given."""
+    exclude, years, max_billing = arguments['--exclude'], arguments['--years'], arguments['--max-billing']
+    if not (exclude or years or max_billing):
+        return None
+
+    exclude_media = [media.strip() for media in exclude.split(',') if media.strip()] if exclude else ()
+    min_year = max_year = None
+    if years:
+        match = re.fullmatch(r'(\d{4})?-(\d{4})?', years.strip())
+        if match is None:
+            raise BaconException('Expected a range of years such as 1980-1999, 1980- or -1999, not "%s".' % years)
+        min_year, max_year = (None if year is None else int(year) for year in match.groups())
+    return CreditFilter(exclude_media, min_year, max_year, None if max_billing is None else int(max_billing))
+
+
+def main():
+    arguments = docopt(__doc__, version='0.1.0')
+    stats = instrumentation.Stats() if arguments['--stats'] else None
+    with instrumentation.attached(stats):
+        _run(arguments)
+    if stats is not None:
+        print('\n'.join(stats.report()))
+
+
+def _run(arguments):
+    index_path = arguments['--index'] or INDEX_FILE
+    workers = int(arguments['--workers'])
+    bipartite = arguments['--bipartite']
+    credit_filter = _credit_filter_from_arguments(arguments)
+
+    # Saved indexes and snapshots were built from whatever credits were kept at the time, so the
+    # filters can't be applied to them.
+    from_saved = (arguments['--distribution'] or arguments['--snapshot'] or
+                  (arguments['--index'] and not arguments['--build-index']))
+    if credit_filter is not None and from_saved:
+        raise BaconException('Credit filters only apply when parsing the actor list, not to a saved index or '
+                             'snapshot; rebuild it with the filters instead.')
+    # The default index is only used if it exists, and was built without the filters.
+    use_index = arguments['--index'] is not None or (credit_filter is None and os.path.exists(index_path))
+
+    if arguments['--build-index']:
+        actor_titles = _read_actor_file(workers=workers, credit_filter=credit_filter)
+        index = _build_bacon_index(actor_titles, bipartite=bipartite)
+        with instrumentation.phase('save index'):
+            index.save(index_path)
+        print('Indexed %s actors.' % len(index.labels))
+    elif arguments['--distribution']:
+        with instrumentation.phase('load index'):
+            index = BaconIndex.load(index_path)
+        for hops, count in index.distribution().items():
+            print('%s\t%s' % ('Not connected' if hops is None else hops, count))
+    elif arguments['--build-snapshot']:
+        create_graph = _create_bipartite_graph if bipartite else _create_actor_graph
+        with instrumentation.phase('build graph'):
+            graph = create_graph(_read_actor_file(workers=workers, credit_filter=credit_filter))
+        with instrumentation.phase('save snapshot'):
+            write_snapshot(graph, arguments['--build-snapshot'])
+    elif arguments['--batch']:
+        if arguments['--batch'] == '-':
+            actors = _read_actor_names(sys.stdin)
+        else:
+            with open(arguments['--batch'], encoding='utf-8') as names_file:
+                actors = _read_actor_names(names_file)
+
+        if use_index:
+            with instrumentation.phase('load index'):
+                results = _batch_hops_from_index(BaconIndex.load(index_path), actors)
+        else:
+            actor_titles = _read_actor_file(workers=workers, credit_filter=credit_filter)
+            results = _batch_hops(actor_titles, actors, bipartite=bipartite)
+        _write_batch_results(results, sys.stdout, arguments['--format'])
+    elif arguments['--snapshot']:
+        with instrumentation.phase('load snapshot'):
+            graph = load_snapshot(arguments['--snapshot'])
+        with instrumentation.phase('search'):
+            hops = _find_hops_in_snapshot(graph, arguments['<actor_name>'])
+        _print_hops(hops)
+    elif use_index:
+        with instrumentation.phase('load index'):
+            index = BaconIndex.load(index_path)
+        _print_hops(index.get_hops(arguments['<actor_name>']))
+    else:
+        actor_titles = _read_actor_file(workers=workers, credit_filter=credit_filter)
+        _print_path(_find_path_to_kevin(actor_titles, arguments['<actor_name>'], bipartite=bipartite))
 
 
 class BaconException(Exception):
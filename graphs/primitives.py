@@ -1,6 +1,8 @@
-import itertools
 from collections import deque, defaultdict
+import hashlib
 import logging
+from graphs import instrumentation
+from graphs.union_find import DisjointSet
 
 _log = logging.getLogger(__name__)
 
@@ -9,51 +11,148 @@ class GraphException(Exception):
     pass
 
 
+class IndexedList:
+    """A list with O(1) membership tests and O(1) removal, for the node and edge lists of a Graph.
+
+    Items must be hashable and unique. Removal moves the last item into the removed item's place,
+    so it doesn't preserve order.
+    """
+    __slots__ = ('_items', '_positions')
+
+    def __init__(self, items=()):
+        self._items = []
+        self._positions = {}
+        self.extend(items)
+
+    def append(self, item):
+        if item in self._positions:
+            raise ValueError('%s is already in the list' % (item,))
+        self._positions[item] = len(self._items)
+        self._items.append(item)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def remove(self, item):
+        position = self._positions.pop(item)  # Raises KeyError, a LookupError, if missing.
+        last_item = self._items.pop()
+        if last_item is not item:
+            self._items[position] = last_item
+            self._positions[last_item] = position
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return repr(self._items)
+
+
+class EdgeList:
+    """The edges of a node, with O(1) add, remove and membership tests.
+
+    Behaves like the list it replaces: an edge appended twice (a self-loop is added once by
+    each end) is iterated twice, and must be removed twice.
+    """
+    __slots__ = ('_counts', '_length')
+
+    def __init__(self):
+        self._counts = {}
+        self._length = 0
+
+    def append(self, edge):
+        self._counts[edge] = self._counts.get(edge, 0) + 1
+        self._length += 1
+
+    def remove(self, edge):
+        count = self._counts.get(edge)
+        if count is None:
+            raise ValueError('%s is not in the list' % (edge,))
+        if count == 1:
+            del self._counts[edge]
+        else:
+            self._counts[edge] = count - 1
+        self._length -= 1
+
+    def __contains__(self, edge):
+        return edge in self._counts
+
+    def __iter__(self):
+        for edge, count in self._counts.items():
+            for _ in range(count):
+                yield edge
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class _DirectedEdgeView:
+    """The incident (or outgoing) edges of a node: undirected edges, plus directed edges with their
+    head (or tail) at the node.
+    """
+    __slots__ = ('_node', '_incident')
+
+    def __init__(self, node, incident):
+        self._node = node
+        self._incident = incident
+
+    def _includes(self, edge):
+        # A directed self-loop counts as incident, as the node is its head.
+        return not edge.directed or (edge.head is self._node) == self._incident
+
+    def __contains__(self, edge):
+        return edge in self._node.edges and self._includes(edge)
+
+    def __iter__(self):
+        return (edge for edge in self._node.edges if self._includes(edge))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class Node:
+    __slots__ = ('edges', 'label')
+
     def __init__(self, label=None):
-        self.edges = []
-        self.incident_edges = []
-        self.outgoing_edges = []
+        self.edges = EdgeList()
         self.label = label
 
+    @property
+    def incident_edges(self):
+        return _DirectedEdgeView(self, incident=True)
+
+    @property
+    def outgoing_edges(self):
+        return _DirectedEdgeView(self, incident=False)
+
     def add_edge(self, edge):
-        """Add an edge to the node's local lists.
+        """Add an edge to the node's edge list.
 
-        Will add to the appropriate incident/outgoing list based
-        on whether the edge is directed.
+        The incident/outgoing views pick it up based on whether the edge is directed.
         """
-        self.edges.append(edge)
-        if not self in [edge.head, edge.tail]:
+        if self is not edge.head and self is not edge.tail:
             raise GraphException('%s does not reference %s' % (edge, self))
-
-        if edge.directed:
-            if edge.head == self:
-                self.incident_edges.append(edge)
-            else:
-                self.outgoing_edges.append(edge)
-        else:
-            # Undirected edge. Count as both incident and outgoing.
-            self.incident_edges.append(edge)
-            self.outgoing_edges.append(edge)
+        self.edges.append(edge)
 
     def remove_edge(self, edge):
-        """Remove an edge from the node's local lists.
-
-        Will remove from the appropriate incident/outgoing list based
-        on whether the edge is directed.
-        """
+        """Remove an edge from the node's edge list."""
         self.edges.remove(edge)
 
-        if edge.directed:
-            if edge.head == self:
-                self.incident_edges.remove(edge)
-            elif edge.tail == self:
-                self.outgoing_edges.remove(edge)
-        else:
-            # Undirected edge. Count as both incident and outgoing.
-            self.incident_edges.remove(edge)
-            self.outgoing_edges.remove(edge)
-
     def get_edges_by_label(self, label):
         """Get a list of edges with the specified label."""
         edges = [edge for edge in self.edges if edge.label == label]
@@ -69,11 +168,13 @@ class Node:
 
 
 class Edge:
+    __slots__ = ('tail', 'head', 'label')
+    directed = False
+
     def __init__(self, tail, head, label=None):
         self.tail = tail
         self.head = head
         self.label = label
-        self.directed = False
         self.tail.add_edge(self)
         self.head.add_edge(self)
 
@@ -93,51 +194,128 @@ class Edge:
         return 'Edge(%s, %s)' % (self.tail, self.head)
 
 
-class DirectedEdge:
-    def __init__(self, tail, head, label=None):
-        self.tail = tail
-        self.head = head
-        self.label = label
-        self.directed = True
-        self.tail.add_edge(self)
-        self.head.add_edge(self)
+class DirectedEdge(Edge):
+    """An edge from tail to head. Both ends keep it in their edge list, like an undirected edge."""
+    __slots__ = ()
+    directed = True
+
+    def __repr__(self):
+        return 'DirectedEdge(%s, %s)' % (self.tail, self.head)
 
 
 class Graph:
     def __init__(self):
-        self.nodes = []
-        self.edges = []
+        self.nodes = IndexedList()
+        self.edges = IndexedList()
+        # Maps each label to the first node added with that label.
+        self._nodes_by_label = {}
+        # Optional union-find index of the connected components; see enable_component_index.
+        self._component_index_enabled = False
+        self._components = None
+        self._component_ids = None
+        # Cached result of fingerprint(), cleared whenever the graph changes.
+        self._fingerprint = None
 
     def add_node(self, node):
+        if node in self.nodes:
+            raise GraphException('Node %s already exists in graph.' % node)
         self.nodes.append(node)
+        self._fingerprint = None
+        self._nodes_by_label.setdefault(node.label, node)
+        if self._components is not None:
+            self._component_ids[node] = self._components.add()
 
     def add_node_by_label(self, label):
-        if label in [node.label for node in self.nodes]:
-            raise GraphException('Node %s already exists in graph.', label)
+        if label in self._nodes_by_label:
+            raise GraphException('Node %s already exists in graph.' % label)
         else:
             node = Node(label=label)
             self.add_node(node)
             return node
 
+    def add_nodes(self, labels):
+        """Add a node for each label in the iterable 'labels'.
+
+        The whole batch is validated before any node is added, so on error the graph is unchanged.
+        """
+        labels = list(labels)
+        unique_labels = set(labels)
+        if len(unique_labels) != len(labels):
+            raise GraphException('Duplicate labels in batch.')
+        existing_labels = unique_labels.intersection(self._nodes_by_label)
+        if existing_labels:
+            raise GraphException('Nodes %s already exist in graph.' % sorted(existing_labels, key=repr))
+
+        nodes = []
+        for label in labels:
+            node = Node(label=label)
+            self.add_node(node)
+            nodes.append(node)
+        return nodes
+
     def remove_node(self, node):
         try:
             self.nodes.remove(node)
-        except ValueError:
+        except LookupError:
             raise GraphException('Node %s not found.' % node)
 
+        # Union-find can't split components, so rebuild the index when it is next queried.
+        self._components = None
+        self._fingerprint = None
+        if self._nodes_by_label.get(node.label) is node:
+            del self._nodes_by_label[node.label]
+            # Fall back to the next node with the same label, if any. There can only be one if
+            # some label is shared, in which case there are fewer labels than nodes.
+            if len(self._nodes_by_label) >= len(self.nodes):
+                return
+            for other_node in self.nodes:
+                if other_node.label == node.label:
+                    self._nodes_by_label[node.label] = other_node
+                    break
+
     def add_edge_by_label(self, tail_label, head_label, edge_label=None, directed=False):
         for label in [tail_label, head_label]:
-            if label not in [node.label for node in self.nodes]:
+            if label not in self._nodes_by_label:
                 raise GraphException('Node %s does not exist in graph.' % label)
 
-        tail = self.get_node_by_label(tail_label)
-        head = self.get_node_by_label(head_label)
+        tail = self._nodes_by_label[tail_label]
+        head = self._nodes_by_label[head_label]
 
         edge_cls = DirectedEdge if directed else Edge
         edge = edge_cls(tail, head, label=edge_label)
         self.edges.append(edge)
+        self._fingerprint = None
+        if self._components is not None:
+            self._components.union(self._component_ids[tail], self._component_ids[head])
         return edge
 
+    def add_edges(self, edges, directed=False):
+        """Add an edge for each (tail_label, head_label[, edge_label]) tuple in the iterable 'edges'.
+
+        The whole batch is validated before any edge is added, so on error the graph is unchanged.
+        """
+        edges = list(edges)
+        missing_labels = set()
+        for edge in edges:
+            for label in edge[:2]:
+                if label not in self._nodes_by_label:
+                    missing_labels.add(label)
+        if missing_labels:
+            raise GraphException('Nodes %s do not exist in graph.' % sorted(missing_labels, key=repr))
+
+        edge_cls = DirectedEdge if directed else Edge
+        nodes_by_label = self._nodes_by_label
+        new_edges = []
+        for edge in edges:
+            edge_label = edge[2] if len(edge) > 2 else None
+            new_edges.append(edge_cls(nodes_by_label[edge[0]], nodes_by_label[edge[1]], label=edge_label))
+        self.edges.extend(new_edges)
+        self._fingerprint = None
+        if self._components is not None:
+            for edge in new_edges:
+                self._components.union(self._component_ids[edge.tail], self._component_ids[edge.head])
+        return new_edges
+
     def remove_edge(self, edge):
         """Remove an edge from the Graph.
 
@@ -145,24 +323,21 @@ class Graph:
         """
         try:
             self.edges.remove(edge)
-            edge.delete()
-        except ValueError:
+        except LookupError:
             raise GraphException('Edge %s not found.' % edge)
+        edge.delete()
+        self._components = None
+        self._fingerprint = None
 
     def get_node_by_label(self, label):
         """Get first node with the specified label."""
-        for node in self.nodes:
-            if node.label == label:
-                return node
-        else:
-            # No hits
+        try:
+            return self._nodes_by_label[label]
+        except KeyError:
             raise GraphException('No node with label "%s"' % label)
 
     def breadth_first_search(self, start, end=None):
         """Perform a breadth-first search for a path from 'start' to 'end'."""
-        for node in self.nodes:
-            node.explored = None
-
         # Put the starting node in the frontier list.
         frontier = deque([start])
         explored_list = []
@@ -175,37 +350,352 @@ class Graph:
 
         # Loop until the frontier is empty (no more nodes to explore), or we find the target.
         while frontier and not found:
-            _log.debug('Frontier: %s', frontier)
             node = frontier.popleft()
-            _log.debug('Exploring node %s', node)
             explored_list.append((node, node_layer[node]))
             if node == end:
                 found = True
             for edge in node.edges:
                 other_node = edge.get_other_node(node)
-                _log.debug('Examining other node %s (explored=%s)', other_node, other_node.explored)
                 if other_node not in explored:
                     frontier.append(other_node)
                     explored[other_node] = True
                     node_layer[other_node] = node_layer[node] + 1
-                    _log.debug('Marked other node explored, layer=%s', node_layer[other_node])
                     # Else other node was explored already, so ignore it.
 
+        if instrumentation.hook is not None:
+            self._record_search('bfs', explored_list)
+        return found, explored_list
+
+    @staticmethod
+    def _record_search(name, explored_list):
+        """Report a finished search, given the (node, layer) tuples of the nodes it expanded."""
+        instrumentation.hook.record_search(name, len(explored_list),
+                                           sum(len(node.edges) for node, _ in explored_list),
+                                           instrumentation.count_layers(layer for _, layer in explored_list))
+
+    def directed_breadth_first_search(self, start, end=None):
+        """Perform a breadth-first search like breadth_first_search, following only outgoing edges.
+
+        Directed edges are followed from tail to head, and undirected edges either way.
+        """
+        frontier = deque([start])
+        explored_list = []
+        node_layer = {start: 0}
+        found = False
+
+        while frontier and not found:
+            node = frontier.popleft()
+            layer = node_layer[node]
+            explored_list.append((node, layer))
+            if node is end:
+                found = True
+            for edge in node.edges:
+                # Inlined outgoing_edges, which is slower to iterate.
+                if edge.directed:
+                    if edge.tail is not node:
+                        continue
+                    other_node = edge.head
+                else:
+                    other_node = edge.get_other_node(node)
+                if other_node not in node_layer:
+                    node_layer[other_node] = layer + 1
+                    frontier.append(other_node)
+
+        if instrumentation.hook is not None:
+            self._record_search('directed bfs', explored_list)
         return found, explored_list
 
+    def depth_first_search(self, start, directed=True):
+        """Perform an iterative depth-first search from 'start', returning the nodes in the order reached.
+
+        Visits nodes in the same order as the recursive algorithm, without its recursion depth limit.
+        With 'directed', only outgoing edges are followed.
+        """
+        explored = {start}
+        explored_list = [start]
+        # Each entry holds a node on the current path and the iterator over its remaining edges.
+        stack = [(start, iter(start.edges))]
+
+        while stack:
+            node, edges = stack[-1]
+            for edge in edges:
+                if directed and edge.directed and edge.tail is not node:
+                    continue
+                other_node = edge.get_other_node(node)
+                if other_node not in explored:
+                    explored.add(other_node)
+                    explored_list.append(other_node)
+                    stack.append((other_node, iter(other_node.edges)))
+                    break
+            else:
+                stack.pop()
+
+        return explored_list
+
+    def strongly_connected_components(self):
+        """Find the strongly connected components, following directed edges from tail to head.
+
+        Uses an iterative form of Tarjan's algorithm, so it runs in O(V + E) with no recursion.
+        Returns a list of components, each a list of nodes, in reverse topological order: no
+        component has an edge to a later one. Undirected edges join their ends both ways.
+        """
+        index = {}
+        low_link = {}
+        on_stack = set()
+        stack = []
+        components = []
+
+        for root in self.nodes:
+            if root in index:
+                continue
+            index[root] = low_link[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(root.edges))]
+
+            while work:
+                node, edges = work[-1]
+                for edge in edges:
+                    if edge.directed and edge.tail is not node:
+                        continue
+                    other_node = edge.get_other_node(node)
+                    if other_node not in index:
+                        index[other_node] = low_link[other_node] = len(index)
+                        stack.append(other_node)
+                        on_stack.add(other_node)
+                        work.append((other_node, iter(other_node.edges)))
+                        break
+                    elif other_node in on_stack and index[other_node] < low_link[node]:
+                        low_link[node] = index[other_node]
+                else:
+                    # Every edge of the node has been followed.
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if low_link[node] < low_link[parent]:
+                            low_link[parent] = low_link[node]
+                    if low_link[node] == index[node]:
+                        component = []
+                        member = None
+                        while member is not node:
+                            member = stack.pop()
+                            on_stack.remove(member)
+                            component.append(member)
+                        components.append(component)
+
+        _log.debug('Found %s strongly connected components', len(components))
+        return components
+
+    def breadth_first_tree(self, start, targets=None):
+        """Run a breadth-first search from 'start', recording how each node was reached.
+
+        Returns a dict mapping every node reachable from 'start' to a (layer, parent_edge) tuple,
+        in discovery order. The parent edge of 'start' is None. If 'targets' is given, the search
+        stops as soon as all of those nodes have been reached, so the tree may be partial.
+        """
+        tree = {start: (0, None)}
+        frontier = deque([start])
+        remaining = None if targets is None else set(targets) - {start}
+
+        while frontier and remaining != set():
+            node = frontier.popleft()
+            next_layer = tree[node][0] + 1
+            for edge in node.edges:
+                other_node = edge.get_other_node(node)
+                if other_node not in tree:
+                    tree[other_node] = (next_layer, edge)
+                    frontier.append(other_node)
+                    if remaining is not None:
+                        remaining.discard(other_node)
+                        if not remaining:
+                            break
+
+        if instrumentation.hook is not None:
+            self._record_search('bfs tree', [(node, layer) for node, (layer, _) in tree.items()])
+        return tree
+
+    def bidirectional_search(self, start, end):
+        """Search for a shortest path from 'start' to 'end' by growing a frontier from each end.
+
+        Each step expands one whole layer of the smaller frontier, and the search stops as soon as
+        the two frontiers touch. Returns (distance, path), where path is the list of nodes from
+        'start' to 'end', or (None, []) if there is no path.
+        """
+        path, _ = self.bidirectional_path(start, end)
+        return (len(path) - 1 if path else None), path
+
+    def bidirectional_path(self, start, end):
+        """Find a shortest path from 'start' to 'end' as in bidirectional_search, with its edges.
+
+        Returns (nodes, edges), where edges[i] joins nodes[i] to nodes[i + 1], or ([], []) if there
+        is no path. The search already records the edge each node was reached through, so the path
+        is rebuilt in time proportional to its length.
+        """
+        # Each side maps its discovered nodes to the edge they were discovered through.
+        forward_parents = {start: None}
+        backward_parents = {end: None}
+        forward_frontier = [start]
+        backward_frontier = [end]
+        meeting_node = start if start is end else None
+
+        # Sizes of the frontiers expanded, in order; only tracked when instrumentation is attached.
+        expanded = [] if instrumentation.hook is not None else None
+        while meeting_node is None and forward_frontier and backward_frontier:
+            if expanded is not None:
+                expanded.append(min(forward_frontier, backward_frontier, key=len))
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting_node = self._expand_layer(
+                    forward_frontier, forward_parents, backward_parents)
+            else:
+                backward_frontier, meeting_node = self._expand_layer(
+                    backward_frontier, backward_parents, forward_parents)
+
+        if expanded is not None:
+            # The last frontier may stop early when the two sides meet, so its edges are an upper bound.
+            instrumentation.hook.record_search('bidirectional', sum(len(frontier) for frontier in expanded),
+                                               sum(len(node.edges) for frontier in expanded for node in frontier),
+                                               [len(frontier) for frontier in expanded])
+
+        if meeting_node is None:
+            return [], []
+
+        nodes, edges = self._walk_parents(forward_parents, meeting_node)
+        nodes.reverse()
+        edges.reverse()
+        backward_nodes, backward_edges = self._walk_parents(backward_parents, meeting_node)
+        nodes.extend(backward_nodes[1:])
+        edges.extend(backward_edges)
+        return nodes, edges
+
+    @staticmethod
+    def _expand_layer(frontier, parents, other_parents):
+        """Expand one BFS layer; return the next frontier and the first node seen by both sides."""
+        next_frontier = []
+        for node in frontier:
+            for edge in node.edges:
+                other_node = edge.get_other_node(node)
+                if other_node not in parents:
+                    parents[other_node] = edge
+                    if other_node in other_parents:
+                        return next_frontier, other_node
+                    next_frontier.append(other_node)
+        return next_frontier, None
+
+    @staticmethod
+    def _walk_parents(parents, node):
+        """Follow parent edges from 'node' back to the root of the search, returning (nodes, edges)."""
+        nodes = [node]
+        edges = []
+        edge = parents[node]
+        while edge is not None:
+            node = edge.get_other_node(node)
+            nodes.append(node)
+            edges.append(edge)
+            edge = parents[node]
+        return nodes, edges
+
     def bfs_connected_regions(self):
-        """Use the BFS algorithm to determine the connected regions of an undirected graph."""
-        regions = []
-        for node in self.nodes:
-            # Make a list from the nodes in all regions.
-            discovered_nodes = itertools.chain.from_iterable(regions)
-            if node not in discovered_nodes:
-                _, new_explored = self.breadth_first_search(node)
-                regions.append([result[0] for result in new_explored])  # Unpack the explored tuples to get the nodes.
-                _log.info('Found new region %s', regions[-1])
+        """Use the BFS algorithm to determine the connected regions of an undirected graph.
 
+        Runs in O(V + E): a single explored set is shared by the searches from each unexplored node.
+        """
+        regions = []
+        explored = set()
+        for start in self.nodes:
+            if start in explored:
+                continue
+            explored.add(start)
+            region = [start]
+            frontier = deque([start])
+            while frontier:
+                node = frontier.popleft()
+                for edge in node.edges:
+                    other_node = edge.get_other_node(node)
+                    if other_node not in explored:
+                        explored.add(other_node)
+                        region.append(other_node)
+                        frontier.append(other_node)
+            regions.append(region)
+            _log.debug('Found new region of %s nodes', len(region))
+
+        if instrumentation.hook is not None:
+            instrumentation.hook.count('connected regions', len(regions))
+            instrumentation.hook.count('connected regions edges scanned', sum(len(node.edges) for node in self.nodes))
         return regions
 
+    def enable_component_index(self):
+        """Maintain a union-find index of the connected components as edges are added.
+
+        Once enabled, connected and component_size are near-O(1). Removing a node or edge
+        invalidates the index, which is then rebuilt in O(V + E) by the next query. Edge direction
+        is ignored.
+        """
+        self._component_index_enabled = True
+        self._build_component_index()
+
+    def _build_component_index(self):
+        self._component_ids = {node: i for i, node in enumerate(self.nodes)}
+        self._components = DisjointSet(len(self.nodes))
+        for edge in self.edges:
+            self._components.union(self._component_ids[edge.tail], self._component_ids[edge.head])
+
+    def _get_component_id(self, label):
+        if not self._component_index_enabled:
+            raise GraphException('The component index is not enabled.')
+        if self._components is None:
+            self._build_component_index()
+        return self._component_ids[self.get_node_by_label(label)]
+
+    def connected(self, first_label, second_label):
+        """Whether there is any path between the nodes labelled 'first_label' and 'second_label'."""
+        first_id = self._get_component_id(first_label)
+        second_id = self._get_component_id(second_label)
+        return self._components.connected(first_id, second_id)
+
+    def component_size(self, label):
+        """Get the number of nodes in the connected component containing the node labelled 'label'."""
+        component_id = self._get_component_id(label)
+        return self._components.size(component_id)
+
+    def fingerprint(self):
+        """Get a hash of the graph's structure, in terms of node and edge labels.
+
+        Graphs with the same multiset of node labels and the same multiset of (tail label, head
+        label, edge label, directed) edges have the same fingerprint, whatever the identity or
+        order of their nodes and edges. The endpoints of undirected edges are unordered.
+
+        Computed in O((V + E) log(V + E)) and cached until the graph is changed through its own
+        methods; call invalidate_fingerprint after changing nodes or edges directly.
+        """
+        if self._fingerprint is None:
+            node_keys = sorted(repr(node.label) for node in self.nodes)
+            edge_keys = []
+            for edge in self.edges:
+                ends = [repr(edge.tail.label), repr(edge.head.label)]
+                if not edge.directed:
+                    ends.sort()
+                edge_keys.append('%s\t%s\t%r\t%s' % (ends[0], ends[1], edge.label, edge.directed))
+            edge_keys.sort()
+
+            fingerprint = hashlib.sha256()
+            fingerprint.update(b'%d %d\n' % (len(node_keys), len(edge_keys)))
+            for key in node_keys + edge_keys:
+                fingerprint.update(key.encode('utf-8', 'backslashreplace'))
+                fingerprint.update(b'\n')
+            self._fingerprint = fingerprint.hexdigest()
+
+        return self._fingerprint
+
+    def invalidate_fingerprint(self):
+        self._fingerprint = None
+
+    def structurally_equal(self, other):
+        """Whether 'other' has the same structure as this graph, compared by fingerprint.
+
+        Unlike ==, which compares node and edge identity, this holds for copies of a graph.
+        """
+        return other is not None and self.fingerprint() == other.fingerprint()
+
     def __eq__(self, other):
         if other is None:
             return False
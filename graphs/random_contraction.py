@@ -1,31 +1,36 @@
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from copy import deepcopy
 import logging
-from random import random
+from math import ceil, log, sqrt
+import os
+from random import expovariate, random, shuffle, Random
+import time
+from graphs import instrumentation
+from graphs.union_find import DisjointSet
 
 _log = logging.getLogger(__name__)
 
 
+class ContractionException(Exception):
+    pass
+
+
 def _get_random_edge(graph):
     index = int(random() * len(graph.edges))
-    _log.debug('Random index %s', index)
     edge = graph.edges[index]
     return edge
 
 
 def _merge_nodes(graph, first_node, second_node):
     super_node = first_node
-    _log.debug('First node: %s (%s). Second node: %s (%s).',
-               first_node, first_node.edges, second_node, second_node.edges)
-    for edge in second_node.edges:
-        _log.debug('Processing edge %s', edge)
+    # Iterate over a copy, as removing self-loops changes the node's edge list.
+    for edge in list(second_node.edges):
         # First, check whether this edge will be a self-loop (in which case remove it)
         if ((edge.head == second_node and edge.tail == first_node) or
                 (edge.head == first_node and edge.tail == second_node)):
-            _log.debug('Self-loop, removing edge %s.', edge)
             graph.remove_edge(edge)
         else:
             # Retarget all edges to point to the merged node instead of the second node.
-            _log.debug('Retargeting edge %s', edge)
             if edge.head == second_node:
                 edge.head = super_node
             else:
@@ -34,7 +39,6 @@ def _merge_nodes(graph, first_node, second_node):
 
             # Update the supernode's edge list too.
             super_node.add_edge(edge)
-            _log.debug('New edge is %s', edge)
 
     # Finally, trim the second node that was merged.
     graph.remove_node(second_node)
@@ -53,4 +57,270 @@ def run_random_contraction_algorithm(graph):
         if len(working_graph.edges) < min_edges:
             min_edges = len(working_graph.edges)
 
+    if instrumentation.hook is not None:
+        instrumentation.hook.count('contraction trials', iterations)
+        instrumentation.hook.count('contractions', iterations * max(len(graph.nodes) - 2, 0))
     return min_edges
+
+
+def _edge_list(graph):
+    """Convert a graph into its node count and a list of (tail, head) node index pairs."""
+    positions = {node: i for i, node in enumerate(graph.nodes)}
+    return len(positions), [(positions[edge.tail], positions[edge.head]) for edge in graph.edges]
+
+
+def _collapse_edges(edges):
+    """Merge the parallel edges in a list of (tail, head) pairs into (tail, head, weight) triples.
+
+    Self-loops are dropped.
+    """
+    weights = {}
+    for tail, head in edges:
+        if tail != head:
+            pair = (tail, head) if tail < head else (head, tail)
+            weights[pair] = weights.get(pair, 0) + 1
+    return [(tail, head, weight) for (tail, head), weight in weights.items()]
+
+
+def _contract(node_count, edges, target):
+    """Randomly contract the weighted multigraph given by 'node_count' and 'edges' down to 'target' nodes.
+
+    Each (tail, head, weight) triple in 'edges' stands for 'weight' parallel edges. Contracting the
+    pairs in order of exponential random keys with rate 'weight', skipping pairs whose ends are
+    already merged, is equivalent to repeatedly contracting a uniformly random remaining edge.
+
+    Returns the node count and weighted edge list of the contracted multigraph, with its nodes
+    renumbered from 0, parallel edges merged and self-loops dropped. The input is not modified.
+    """
+    sets = DisjointSet(node_count)
+    for _, tail, head in sorted((expovariate(weight), tail, head) for tail, head, weight in edges):
+        if sets.count <= target:
+            break
+        sets.union(tail, head)
+
+    find = sets.find
+    renumbered = {}
+    for node in range(node_count):
+        renumbered.setdefault(find(node), len(renumbered))
+    weights = {}
+    for tail, head, weight in edges:
+        tail, head = renumbered[find(tail)], renumbered[find(head)]
+        if tail != head:
+            pair = (tail, head) if tail < head else (head, tail)
+            weights[pair] = weights.get(pair, 0) + weight
+    return len(renumbered), [(tail, head, weight) for (tail, head), weight in weights.items()]
+
+
+def _brute_force_min_cut(node_count, edges):
+    """Find the min cut of a small weighted multigraph exactly, by trying every bipartition of its nodes."""
+    if node_count < 2:
+        return 0
+    # Keep the last node on the unset side of the mask, so each bipartition is only tried once.
+    return min(sum(weight for tail, head, weight in edges if (mask >> tail ^ mask >> head) & 1)
+               for mask in range(1, 2 ** (node_count - 1)))
+
+
+def _karger_stein(node_count, edges):
+    if not edges:
+        # Without edges the nodes can't be contracted any further, and every cut is empty.
+        return 0
+    if node_count <= 6:
+        return _brute_force_min_cut(node_count, edges)
+
+    # Contracting to n / sqrt(2) nodes preserves a given min cut with probability at least 1/2,
+    # so branching twice at each level keeps the overall success probability at Omega(1 / log n).
+    target = ceil(1 + node_count / sqrt(2))
+    return min(_karger_stein(*_contract(node_count, edges, target)) for _ in range(2))
+
+
+def run_karger_stein_algorithm(graph, trials=None):
+    """Find the size of a minimum cut using the Karger-Stein recursive contraction algorithm.
+
+    Each trial succeeds with probability Omega(1 / log n), so the default of log(n)**2 trials finds
+    the min cut with high probability in O(n**2 log**3 n) time, compared to the O(n**4) of
+    run_random_contraction_algorithm. Parallel edges are merged into weighted pairs, so each level
+    of the recursion works on at most n_i**2 pairs, however many edges the graph has.
+    """
+    node_count, edges = _edge_list(graph)
+    if node_count <= 2:
+        return len(edges)
+    if trials is None:
+        trials = ceil(log(node_count) ** 2)
+
+    edges = _collapse_edges(edges)
+    _log.info('Running %s Karger-Stein trials', trials)
+    return min(_karger_stein(node_count, edges) for _ in range(trials))
+
+
+def _run_contraction_trial(edges, order, sets, shuffle=shuffle):
+    """Run one random contraction trial and return the size of the cut it finds.
+
+    Contracting edges in a uniformly shuffled order, skipping edges whose ends are already merged,
+    is equivalent to repeatedly contracting a uniformly random remaining edge. 'order' (a list of
+    edge indices) and 'sets' (a DisjointSet over the nodes) are reused between trials; afterwards
+    'sets' holds the two sides of the cut. 'shuffle' may be a seeded Random's shuffle method.
+    """
+    sets.reset()
+    shuffle(order)
+    for index in order:
+        if sets.count <= 2:
+            break
+        sets.union(*edges[index])
+
+    find = sets.find
+    return sum(1 for tail, head in edges if find(tail) != find(head))
+
+
+def run_union_find_contraction_algorithm(graph, trials=None):
+    """Find the size of a minimum cut with n**2 random contraction trials, as run_random_contraction_algorithm.
+
+    Each trial merges nodes in a DisjointSet instead of rewriting a deep copy of the graph, so it
+    takes near-linear time and leaves 'graph' untouched.
+    """
+    node_count, edges = _edge_list(graph)
+    if trials is None:
+        trials = node_count ** 2
+    order = list(range(len(edges)))
+    sets = DisjointSet(node_count)
+
+    _log.info('Running %s union-find contraction trials', trials)
+    min_edges = len(edges)
+    for _ in range(trials):
+        min_edges = min(min_edges, _run_contraction_trial(edges, order, sets))
+
+    return min_edges
+
+
+# Trials are handed to workers in batches of this size. Batch b always uses the seed stream
+# '<seed>:<b>', so results don't depend on which worker runs it.
+TRIALS_PER_BATCH = 64
+
+# Edge list for the trial batches in a worker process, set by _init_contraction_worker.
+_worker_graph = None
+
+
+def _init_contraction_worker(node_count, edges):
+    global _worker_graph
+    _worker_graph = node_count, edges
+
+
+def _run_contraction_batch(seed, batch, trials, graph=None):
+    """Run a batch of seeded trials. Returns the best cut size and the nodes on node 0's side of it."""
+    node_count, edges = graph or _worker_graph
+    rng = Random('%s:%s' % (seed, batch))
+    order = list(range(len(edges)))
+    sets = DisjointSet(node_count)
+
+    best_cut, best_side = None, None
+    for _ in range(trials):
+        cut = _run_contraction_trial(edges, order, sets, shuffle=rng.shuffle)
+        if best_cut is None or cut < best_cut:
+            best_cut = cut
+            best_side = [node for node in range(node_count) if sets.connected(node, 0)]
+    return best_cut, best_side
+
+
+def _trials_for_confidence(node_count, confidence):
+    """Number of trials needed to find a min cut with probability 'confidence'.
+
+    A single trial finds a given min cut with probability at least 2 / (n * (n - 1)).
+    """
+    success = 2 / (node_count * (node_count - 1))
+    if success >= 1:
+        return 1
+    return ceil(log(1 - confidence) / log(1 - success))
+
+
+def _settled_batch(results, lower_bound):
+    """Get the lowest batch whose cut reached 'lower_bound', if every batch before it has finished."""
+    batch = 0
+    while batch in results:
+        if results[batch][0] <= lower_bound:
+            return batch
+        batch += 1
+    return None
+
+
+def run_parallel_contraction_algorithm(graph, trials=None, timeout=None, confidence=None, workers=None, seed=0):
+    """Find a minimum cut by running seeded random contraction trials across a pool of processes.
+
+    Stops after 'trials' trials, after enough trials to reach 'confidence' (a success probability),
+    or after 'timeout' seconds, whichever comes first; with none of these, runs n**2 trials like
+    run_random_contraction_algorithm. Also stops once a cut of 0 (disconnected graph) or 1
+    (connected graph) is found, since no smaller cut is possible.
+
+    Returns (cut size, (labels on one side, labels on the other)). For a given seed the result is
+    reproducible unless the timeout cuts the run short. workers=1 runs in the calling process.
+    """
+    if trials is not None and trials < 1:
+        raise ContractionException('Need at least one trial, not %s.' % trials)
+    if confidence is not None and not 0 < confidence < 1:
+        raise ContractionException('Confidence must be strictly between 0 and 1, not %s.' % confidence)
+
+    node_count, edges = _edge_list(graph)
+    labels = [node.label for node in graph.nodes]
+    if node_count < 2:
+        return 0, (set(labels), set())
+
+    budget = float('inf')
+    if trials is None and confidence is None and timeout is None:
+        budget = node_count ** 2
+    if trials is not None:
+        budget = min(budget, trials)
+    if confidence is not None:
+        budget = min(budget, _trials_for_confidence(node_count, confidence))
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    components = DisjointSet(node_count)
+    for tail, head in edges:
+        components.union(tail, head)
+    lower_bound = 0 if components.count > 1 else 1
+
+    def batches():
+        batch = 0
+        while batch * TRIALS_PER_BATCH < budget:
+            if batch and deadline is not None and time.monotonic() > deadline:
+                _log.info('Timed out after %s batches', batch)
+                return
+            yield batch, min(TRIALS_PER_BATCH, budget - batch * TRIALS_PER_BATCH)
+            batch += 1
+
+    results = {}
+    if workers == 1:
+        for batch, batch_trials in batches():
+            results[batch] = _run_contraction_batch(seed, batch, batch_trials, graph=(node_count, edges))
+            if _settled_batch(results, lower_bound) is not None:
+                break
+    else:
+        workers = workers or os.cpu_count()
+        pending_batches = batches()
+        running = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_contraction_worker,
+                                 initargs=(node_count, edges)) as executor:
+            while True:
+                # Keep two batches queued per worker, so no worker idles while results are merged.
+                for batch, batch_trials in pending_batches:
+                    running[executor.submit(_run_contraction_batch, seed, batch, batch_trials)] = batch
+                    if len(running) >= 2 * workers:
+                        break
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+                if _settled_batch(results, lower_bound) is not None:
+                    for future in running:
+                        future.cancel()
+                    break
+
+    _log.info('Ran %s batches of up to %s trials', len(results), TRIALS_PER_BATCH)
+    settled_batch = _settled_batch(results, lower_bound)
+    if settled_batch is not None:
+        best_cut, best_side = results[settled_batch]
+    else:
+        # Break ties by batch number, so the partition doesn't depend on completion order.
+        best_cut, _, best_side = min((cut, batch, side) for batch, (cut, side) in results.items())
+
+    best_side = set(best_side)
+    return best_cut, ({labels[node] for node in best_side},
+                      {labels[node] for node in range(node_count) if node not in best_side})
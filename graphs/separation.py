@@ -0,0 +1,110 @@
+from collections import OrderedDict
+import logging
+import sys
+from graphs import instrumentation
+
+_log = logging.getLogger(__name__)
+
+# Default memory budget for the cached BFS trees.
+DEFAULT_MEMORY_BUDGET = 256 << 20
+# Approximate size of one entry in a BFS tree: its (layer, parent_edge) tuple. Layers are small
+# ints, which are shared, and the dict slot is counted by sys.getsizeof of the dict itself.
+TREE_ENTRY_BYTES = sys.getsizeof((0, None))
+
+
+class DegreesOfSeparation:
+    """Answers distance queries between any two nodes of a Graph, caching BFS trees by source.
+
+    A query runs a full breadth-first search from its source, and the tree is kept in a least
+    recently used cache, so later queries from the same source are dictionary lookups. Trees are
+    evicted once their estimated size exceeds 'memory_budget' bytes, or there are more than
+    'max_trees' of them. Searches ignore edge direction, so a cached tree from the target answers
+    a query too.
+
+    The cache assumes the graph doesn't change; call clear() after modifying it.
+    """
+    def __init__(self, graph, memory_budget=DEFAULT_MEMORY_BUDGET, max_trees=None):
+        self.graph = graph
+        self.memory_budget = memory_budget
+        self.max_trees = max_trees
+        self.hits = 0
+        self.misses = 0
+        self._trees = OrderedDict()
+        self._tree_sizes = {}
+        self._cached_bytes = 0
+
+    def distance(self, source_label, target_label):
+        """Get the number of hops between two labelled nodes, or None if they aren't connected."""
+        source, target = self.graph.get_node_by_label(source_label), self.graph.get_node_by_label(target_label)
+        tree, node = self._find_tree(source, target)
+        entry = tree.get(node)
+        return None if entry is None else entry[0]
+
+    def path(self, source_label, target_label):
+        """Get the nodes on a shortest path from 'source_label' to 'target_label', or [] if there is none."""
+        source, target = self.graph.get_node_by_label(source_label), self.graph.get_node_by_label(target_label)
+        tree, node = self._find_tree(source, target)
+        if node not in tree:
+            return []
+
+        path = [node]
+        edge = tree[node][1]
+        while edge is not None:
+            node = edge.get_other_node(node)
+            path.append(node)
+            edge = tree[node][1]
+        # The walk runs from the far end back to the tree's root.
+        if path[0] is target:
+            path.reverse()
+        return path
+
+    def clear(self):
+        self._trees.clear()
+        self._tree_sizes.clear()
+        self._cached_bytes = 0
+
+    @property
+    def cached_sources(self):
+        """The sources with cached trees, from least to most recently used."""
+        return list(self._trees)
+
+    @property
+    def cached_bytes(self):
+        return self._cached_bytes
+
+    def _find_tree(self, source, target):
+        """Get a BFS tree to answer a query, and the node to look up in it.
+
+        Uses the tree from 'source' if it's cached, then the tree from 'target', and otherwise
+        searches from 'source' and caches the result.
+        """
+        for root, node in ((source, target), (target, source)):
+            tree = self._trees.get(root)
+            if tree is not None:
+                self._trees.move_to_end(root)
+                self.hits += 1
+                if instrumentation.hook is not None:
+                    instrumentation.hook.count('separation cache hits')
+                return tree, node
+
+        self.misses += 1
+        if instrumentation.hook is not None:
+            instrumentation.hook.count('separation cache misses')
+        tree = self.graph.breadth_first_tree(source)
+        self._add_tree(source, tree)
+        return tree, target
+
+    def _add_tree(self, source, tree):
+        size = sys.getsizeof(tree) + len(tree) * TREE_ENTRY_BYTES
+        if size > self.memory_budget:
+            _log.info('BFS tree from %s needs %s bytes, over the whole budget; not caching it', source, size)
+            return
+
+        self._trees[source] = tree
+        self._tree_sizes[source] = size
+        self._cached_bytes += size
+        while (self._cached_bytes > self.memory_budget or
+               (self.max_trees is not None and len(self._trees) > self.max_trees)):
+            evicted, _ = self._trees.popitem(last=False)
+            self._cached_bytes -= self._tree_sizes.pop(evicted)
+            _log.debug('Evicted BFS tree from %s', evicted)
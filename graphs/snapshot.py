@@ -0,0 +1,172 @@
+"""Binary graph snapshots, loaded with mmap.
+
+A snapshot is a header followed by five sections, each padded to a multiple of 8 bytes:
+
+    offsets        int64[node_count + 1]   CSR offsets into targets
+    targets        int32[target_count]     CSR neighbour indices
+    label_offsets  int64[node_count + 1]   offsets of each label in the string table
+    label_order    int32[node_count]       node indices sorted by label, for binary search
+    string table   UTF-8 labels, back to back
+
+Loading maps the file and wraps the sections in memoryviews, so startup does no parsing and
+processes loading the same snapshot share its pages.
+
+The section and string table helpers are shared with the other binary formats in the package.
+"""
+from array import array
+import logging
+import mmap
+import struct
+import sys
+from graphs.compact import CompactGraph, OFFSET_TYPECODE, TARGET_TYPECODE
+from graphs.primitives import Graph
+
+_log = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'GRAPHSNP'
+SNAPSHOT_VERSION = 1
+# Magic, version, flags, node count, target count, string table size.
+HEADER = struct.Struct('<8sIIQQQ')
+ALIGNMENT = 8
+
+FLAG_DIRECTED = 1
+FLAG_BIG_ENDIAN = 2
+NATIVE_BYTE_ORDER_FLAG = FLAG_BIG_ENDIAN if sys.byteorder == 'big' else 0
+
+
+class SnapshotException(Exception):
+    pass
+
+
+class LabelTable:
+    """A read-only sequence of the labels in a string table, decoded on access."""
+    def __init__(self, strings, label_offsets):
+        self._strings = strings
+        self._label_offsets = label_offsets
+
+    def get_bytes(self, index):
+        return bytes(self._strings[self._label_offsets[index]:self._label_offsets[index + 1]])
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.get_bytes(index).decode('utf-8')
+
+    def __len__(self):
+        return len(self._label_offsets) - 1
+
+
+class LabelIndex:
+    """Maps a label to the first node carrying it, by binary search over the sorted label order."""
+    def __init__(self, labels, label_order):
+        self._labels = labels
+        self._label_order = label_order
+
+    def __getitem__(self, label):
+        target = label.encode('utf-8')
+        low, high = 0, len(self._label_order)
+        # Find the leftmost match; ties are sorted by node index, so this is the first node.
+        while low < high:
+            middle = (low + high) // 2
+            if self._labels.get_bytes(self._label_order[middle]) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._label_order) and self._labels.get_bytes(self._label_order[low]) == target:
+            return self._label_order[low]
+        raise KeyError(label)
+
+
+def encode_string_table(strings):
+    """Encode strings as UTF-8, back to back. Returns (offsets, string table), where string i is
+    table[offsets[i]:offsets[i + 1]]."""
+    offsets = array(OFFSET_TYPECODE, [0])
+    encoded_strings = []
+    for string in strings:
+        encoded_string = string.encode('utf-8')
+        encoded_strings.append(encoded_string)
+        offsets.append(offsets[-1] + len(encoded_string))
+    return offsets, b''.join(encoded_strings)
+
+
+def sorted_label_order(labels):
+    """Get the positions of 'labels' sorted by label, ties by position, for a LabelIndex.
+
+    UTF-8 preserves code point order, so this is also the order of the encoded labels.
+    """
+    return array(TARGET_TYPECODE, sorted(range(len(labels)), key=labels.__getitem__))
+
+
+def write_sections(output_file, sections):
+    """Write each buffer in 'sections' to 'output_file', padded to a multiple of ALIGNMENT bytes."""
+    for data in sections:
+        output_file.write(data)
+        padding = -len(memoryview(data).cast('B')) % ALIGNMENT
+        output_file.write(bytes(padding))
+
+
+def read_sections(data, header_size, layout):
+    """Wrap the sections after a header in memoryviews, without copying them.
+
+    'layout' lists a (typecode, count) pair for each section, as written by write_sections.
+    Raises SnapshotException if the sections run past the end of 'data'.
+    """
+    view = memoryview(data)
+    position = header_size + (-header_size % ALIGNMENT)
+    sections = []
+    for typecode, count in layout:
+        size = count * array(typecode).itemsize
+        if position + size > len(data):
+            raise SnapshotException('Expected %s bytes of sections, found %s.' % (position + size, len(data)))
+        sections.append(view[position:position + size].cast(typecode))
+        position += size + (-size % ALIGNMENT)
+    return sections
+
+
+def write_snapshot(graph, path):
+    """Write a Graph or CompactGraph to 'path'. Labels must be strings; edge labels are not saved."""
+    if isinstance(graph, Graph):
+        graph = CompactGraph.from_graph(graph)
+
+    labels = list(graph.labels)
+    for label in labels:
+        if not isinstance(label, str):
+            raise SnapshotException('Snapshot labels must be strings, not %r' % (label,))
+    label_offsets, strings = encode_string_table(labels)
+
+    flags = NATIVE_BYTE_ORDER_FLAG | (FLAG_DIRECTED if graph.directed else 0)
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags,
+                                        graph.node_count, len(graph.targets), len(strings)))
+        write_sections(snapshot_file, [array(OFFSET_TYPECODE, graph.offsets), array(TARGET_TYPECODE, graph.targets),
+                                       label_offsets, sorted_label_order(labels), strings])
+
+    _log.info('Wrote snapshot of %s to %s', graph, path)
+
+
+def load_snapshot(path):
+    """Map the snapshot at 'path' and return it as a CompactGraph backed by the mapping."""
+    with open(path, 'rb') as snapshot_file:
+        data = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(data) < HEADER.size:
+        raise SnapshotException('%s is too short to be a snapshot.' % path)
+    magic, version, flags, node_count, target_count, strings_size = HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise SnapshotException('%s is not a version %s snapshot.' % (path, SNAPSHOT_VERSION))
+    if flags & FLAG_BIG_ENDIAN != NATIVE_BYTE_ORDER_FLAG:
+        raise SnapshotException('%s was written on a machine with a different byte order.' % path)
+
+    try:
+        offsets, targets, label_offsets, label_order, strings = read_sections(
+            data, HEADER.size, [(OFFSET_TYPECODE, node_count + 1),
+                                (TARGET_TYPECODE, target_count),
+                                (OFFSET_TYPECODE, node_count + 1),
+                                (TARGET_TYPECODE, node_count),
+                                ('B', strings_size)])
+    except SnapshotException:
+        raise SnapshotException('%s is truncated.' % path)
+
+    labels = LabelTable(strings, label_offsets)
+    return CompactGraph(labels, offsets, targets, directed=bool(flags & FLAG_DIRECTED),
+                        index=LabelIndex(labels, label_order))
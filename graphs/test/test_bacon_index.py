@@ -0,0 +1,80 @@
+import logging
+import os
+import tempfile
+from unittest.case import TestCase
+from graphs.bacon_index import BaconIndex, BaconIndexException
+from graphs.kevin_bacon import _create_actor_graph, BACON, _build_bacon_index
+from graphs.test.test_kevin_bacon import LINKED_ACTORS_DICT
+
+_log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestBaconIndex(TestCase):
+    def setUp(self):
+        actor_titles = dict(LINKED_ACTORS_DICT)
+        actor_titles[BACON] = ['Film 1']
+        actor_titles['Eve'] = ['Film 5']
+        self.actor_titles = actor_titles
+        self.index = BaconIndex.build(_create_actor_graph(actor_titles), BACON)
+
+    def test_get_hops(self):
+        """Test that the index records the Bacon number of every actor."""
+        self.assertEqual(self.index.get_hops(BACON), 0)
+        self.assertEqual(self.index.get_hops('Alice'), 1)
+        self.assertEqual(self.index.get_hops('Dan'), 2)
+        self.assertIsNone(self.index.get_hops('Eve'))
+        self.assertRaises(BaconIndexException, self.index.get_hops, 'Nobody')
+
+    def test_get_path(self):
+        """Test that the index can follow parent pointers back to the source."""
+        self.assertEqual(self.index.get_path('Dan'), ['Dan', 'Bob', BACON])
+        self.assertEqual(self.index.get_path('Eve'), [])
+
+    def test_distribution(self):
+        """Test that the distribution counts actors per Bacon number, with unconnected actors last."""
+        self.assertEqual(list(self.index.distribution().items()), [(0, 1), (1, 3), (2, 1), (None, 1)])
+
+    def test_bipartite(self):
+        """Test that an index built from the bipartite graph only holds actors, with the same hops."""
+        index = _build_bacon_index(self.actor_titles, bipartite=True)
+
+        self.assertEqual(index.labels, self.index.labels)
+        self.assertEqual(index.hops, self.index.hops)
+        self.assertEqual(index.get_path('Dan'), ['Dan', 'Bob', BACON])
+
+    def test_save_load(self):
+        """Test that an index survives a round trip through a file."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bacon.idx')
+            self.index.save(path)
+            loaded = BaconIndex.load(path)
+
+        self.assertEqual(list(loaded.labels), self.index.labels)
+        self.assertEqual(list(loaded.hops), list(self.index.hops))
+        self.assertEqual(list(loaded.parents), list(self.index.parents))
+        self.assertEqual(loaded.get_path('Dan'), ['Dan', 'Bob', BACON])
+        self.assertEqual(loaded.distribution(), self.index.distribution())
+        # Lookups binary search the mapped label table.
+        self.assertEqual([loaded.get_hops(label) for label in self.index.labels],
+                         [self.index.get_hops(label) for label in self.index.labels])
+        self.assertRaises(BaconIndexException, loaded.get_hops, 'Nobody')
+
+    def test_load_bad_file(self):
+        """Test that loading a file which isn't an index raises BaconIndexException."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bacon.idx')
+            with open(path, 'wb') as index_file:
+                index_file.write(b'Not an index file at all')
+
+            self.assertRaises(BaconIndexException, BaconIndex.load, path)
+
+    def test_load_truncated(self):
+        """Test that loading an index cut short raises BaconIndexException."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bacon.idx')
+            self.index.save(path)
+            with open(path, 'r+b') as index_file:
+                index_file.truncate(os.path.getsize(path) - 16)
+
+            self.assertRaises(BaconIndexException, BaconIndex.load, path)
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from unittest.case import TestCase
+from graphs.bacon_client import BaconClient, BaconClientException
+from graphs.bacon_server import BaconServer
+from graphs.kevin_bacon import BACON, _create_actor_graph, _create_bipartite_graph
+from graphs.snapshot import write_snapshot
+
+_log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+
+SERVER_ACTORS_DICT = {
+    BACON: ['Film 1'],
+    'Alice': ['Film 1', 'Film 2'],
+    'Bob': ['Film 2'],
+    'Zed': ['Film 9'],
+}
+
+
+class TestBaconServer(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'actors.snp')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _run_with_server(self, queries, workers=0, bipartite=False, actors=SERVER_ACTORS_DICT):
+        """Start a server on the test actors, and run the coroutine function 'queries' with a client."""
+        create_graph = _create_bipartite_graph if bipartite else _create_actor_graph
+        write_snapshot(create_graph(actors), self.path)
+
+        async def run():
+            server = BaconServer(self.path, workers=workers)
+            await server.start(port=0)
+            try:
+                host, port = server.address[:2]
+                async with await BaconClient.connect(host, port) as client:
+                    return await queries(client, host, port)
+            finally:
+                await server.close()
+
+        return asyncio.run(run())
+
+    def test_queries(self):
+        """Test that concurrent hops and path queries get the right answers."""
+        async def queries(client, host, port):
+            return await asyncio.gather(client.hops('Bob'), client.hops(BACON), client.hops('Zed'),
+                                        client.path('Bob'))
+
+        self.assertEqual(self._run_with_server(queries), [2, 0, None, ['Bob', 'Alice', BACON]])
+
+    def test_queries_bipartite_worker_pool(self):
+        """Test that a bipartite graph answered by worker processes counts only actor hops."""
+        async def queries(client, host, port):
+            return await asyncio.gather(client.hops('Bob'), client.path('Alice'))
+
+        self.assertEqual(self._run_with_server(queries, workers=2, bipartite=True), [2, ['Alice', BACON]])
+
+    def test_errors(self):
+        """Test that unknown actors and bad requests get an error without closing the connection."""
+        async def queries(client, host, port):
+            with self.assertRaises(BaconClientException):
+                await client.hops('Nobody')
+            with self.assertRaises(BaconClientException):
+                await client.hops('\tFilm 1')
+
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b'not json\n{"op": "delete", "actor": "Bob"}\n')
+            responses = [json.loads(await reader.readline()) for _ in range(2)]
+            writer.close()
+            return responses, await client.hops('Alice')
+
+        responses, hops = self._run_with_server(queries)
+        self.assertEqual(sorted(response['error'] for response in responses),
+                         ['Request is not valid JSON.', "Unknown operation 'delete'."])
+        self.assertEqual(hops, 1)
+
+    def test_invalid_request_with_id(self):
+        """Test that a rejected request is answered with its id, so the client isn't left waiting."""
+        async def queries(client, host, port):
+            with self.assertRaises(BaconClientException) as context:
+                await asyncio.wait_for(client.query('Bob', 'delete'), 5)
+            return str(context.exception)
+
+        self.assertEqual(self._run_with_server(queries), "Unknown operation 'delete'.")
+
+    def test_search_failure(self):
+        """Test that a search raising in a worker gets an error response instead of no response."""
+        actors = {name: titles for name, titles in SERVER_ACTORS_DICT.items() if name != BACON}
+
+        async def queries(client, host, port):
+            with self.assertRaises(BaconClientException) as context:
+                await asyncio.wait_for(client.hops('Bob'), 5)
+            return str(context.exception)
+
+        for workers in [0, 1]:
+            self.assertTrue(self._run_with_server(queries, workers=workers, actors=actors).startswith('Search failed'))
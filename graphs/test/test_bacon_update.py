@@ -0,0 +1,124 @@
+import logging
+import os
+from random import Random
+import tempfile
+from unittest.case import TestCase
+from graphs.bacon_index import BaconIndex
+from graphs.bacon_update import IncrementalBaconIndex, BaconUpdateException
+from graphs.kevin_bacon import _create_actor_graph, BACON
+
+_log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+
+
+def _random_actor_titles(rng, actor_count, title_count, credits_per_actor=2):
+    actor_titles = {BACON: ['Film 0']}
+    for i in range(actor_count):
+        actor_titles['Actor %s' % i] = ['Film %s' % rng.randrange(title_count) for _ in range(credits_per_actor)]
+    return actor_titles
+
+
+def _mutate(rng, actor_titles, title_count, changes):
+    """Randomly add and remove credits and actors."""
+    actor_titles = {actor: list(titles) for actor, titles in actor_titles.items()}
+    actors = sorted(actor for actor in actor_titles if actor != BACON)
+    for _ in range(changes):
+        actor = rng.choice(actors)
+        choice = rng.random()
+        if choice < 0.4 and actor_titles.get(actor):
+            actor_titles[actor].pop(rng.randrange(len(actor_titles[actor])))
+        elif choice < 0.8:
+            actor_titles.setdefault(actor, []).append('Film %s' % rng.randrange(title_count))
+        elif choice < 0.9:
+            actor_titles.pop(actor, None)
+        else:
+            actor_titles['New actor %s' % rng.random()] = ['Film %s' % rng.randrange(title_count)]
+    return actor_titles
+
+
+class TestIncrementalBaconIndex(TestCase):
+    def _assert_matches_rebuild(self, incremental, actor_titles):
+        expected = BaconIndex.build(_create_actor_graph(actor_titles), BACON)
+        index = incremental.to_index()
+
+        self.assertEqual(sorted(index.labels), sorted(expected.labels))
+        for actor in actor_titles:
+            self.assertEqual(index.get_hops(actor), expected.get_hops(actor), actor)
+            path = index.get_path(actor)
+            if path:
+                # Each step of the path must be a real co-star link.
+                self.assertEqual(len(path) - 1, index.get_hops(actor))
+                self.assertEqual(path[-1], BACON)
+                for actor, co_star in zip(path, path[1:]):
+                    self.assertTrue(set(actor_titles[actor]) & set(actor_titles[co_star]))
+
+    def test_update(self):
+        """Test that a few changes are applied as credit changes, and repair the distances."""
+        actor_titles = {BACON: ['Film 1'], 'Alice': ['Film 1', 'Film 2'], 'Bob': ['Film 2', 'Film 3'],
+                        'Claire': ['Film 3']}
+        incremental = IncrementalBaconIndex(actor_titles, BACON)
+        self.assertEqual(incremental.get_hops('Claire'), 3)
+
+        actor_titles = {BACON: ['Film 1', 'Film 3'], 'Alice': ['Film 1'], 'Bob': ['Film 2', 'Film 3'],
+                        'Dan': ['Film 2']}
+        changes = incremental.update(actor_titles)
+
+        self.assertEqual(changes, {'credits added': 2, 'credits removed': 2, 'hops changed': 2})
+        self.assertEqual([incremental.get_hops(actor) for actor in ['Alice', 'Bob', 'Dan']], [1, 1, 2])
+        self._assert_matches_rebuild(incremental, actor_titles)
+
+    def test_update_shared_title_lost_together(self):
+        """Test that an actor is repaired when they and their parent both lose the title they shared."""
+        actor_titles = {BACON: ['Film 1'], 'Alice': ['Film 1', 'Film 2'], 'Bob': ['Film 2']}
+        incremental = IncrementalBaconIndex(actor_titles, BACON)
+
+        changes = incremental.update({BACON: ['Film 1'], 'Alice': ['Film 1'], 'Bob': []})
+
+        self.assertEqual(changes['credits removed'], 2)
+        self.assertIsNone(incremental.get_hops('Bob'))
+
+    def test_random_updates_match_rebuild(self):
+        """Test that a series of random updates gives the same distances as rebuilding from scratch."""
+        rng = Random(4)
+        actor_titles = _random_actor_titles(rng, 200, 150)
+        incremental = IncrementalBaconIndex(actor_titles, BACON)
+        self._assert_matches_rebuild(incremental, actor_titles)
+
+        for changes in [1, 5, 20, 100]:
+            actor_titles = _mutate(rng, actor_titles, 150, changes)
+            incremental.update(actor_titles)
+            self._assert_matches_rebuild(incremental, actor_titles)
+
+    def test_missing_source(self):
+        """Test that an actor list without the source is rejected."""
+        with self.assertRaises(BaconUpdateException):
+            IncrementalBaconIndex({'Alice': ['Film 1']}, BACON)
+
+    def test_save_load(self):
+        """Test that restored state carries on updating exactly like the state that was saved."""
+        rng = Random(7)
+        actor_titles = _random_actor_titles(rng, 100, 80)
+        incremental = IncrementalBaconIndex(actor_titles, BACON)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bacon.state')
+            incremental.save(path)
+            loaded = IncrementalBaconIndex.load(path)
+
+        self.assertEqual(loaded.actor_titles, incremental.actor_titles)
+        for actor in actor_titles:
+            self.assertEqual(loaded.get_hops(actor), incremental.get_hops(actor))
+        self.assertEqual(list(loaded.to_index().parents), list(incremental.to_index().parents))
+
+        actor_titles = _mutate(rng, actor_titles, 80, 20)
+        self.assertEqual(loaded.update(actor_titles), incremental.update(actor_titles))
+        self._assert_matches_rebuild(loaded, actor_titles)
+
+    def test_load_bad_file(self):
+        """Test that loading a file which isn't saved state raises BaconUpdateException."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bacon.state')
+            with open(path, 'wb') as state_file:
+                state_file.write(b'Not a state file, but long enough for a header')
+
+            self.assertRaises(BaconUpdateException, IncrementalBaconIndex.load, path)
@@ -0,0 +1,99 @@
+import logging
+from graphs.compact import CompactGraph
+from graphs.primitives import GraphException
+from graphs.test.test_primitives import GraphTestCase
+
+_log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestCompactGraph(GraphTestCase):
+    def test_from_graph(self):
+        """Test that the CSR arrays list every undirected edge at both ends."""
+        self._setup_triangle_graph()
+
+        compact = CompactGraph.from_graph(self.graph)
+
+        self.assertEqual(compact.node_count, 3)
+        self.assertEqual(compact.edge_count, 3)
+        self.assertEqual(list(compact.offsets), [0, 2, 4, 6])
+        a, b, c = (compact.get_index_by_label(label) for label in 'abc')
+        self.assertEqual(sorted(compact.neighbours(a)), [b, c])
+        self.assertEqual(sorted(compact.neighbours(b)), [a, c])
+
+    def test_from_graph_directed(self):
+        """Test that directed edges are only stored at their tail."""
+        self._setup_triangle_graph(directed=True)
+
+        compact = CompactGraph.from_graph(self.graph)
+
+        self.assertTrue(compact.directed)
+        self.assertEqual(compact.edge_count, 3)
+        a, b = compact.get_index_by_label('a'), compact.get_index_by_label('b')
+        self.assertEqual(list(compact.neighbours(a)), [b])
+
+    def test_round_trip(self):
+        """Test that converting to and from a CompactGraph preserves labels and edges."""
+        self._setup_triangle_graph()
+        self.graph.add_node_by_label('d')
+        self.graph.add_edge_by_label('a', 'b', edge_label='parallel')
+        self.graph.add_edge_by_label('d', 'd')
+
+        graph = CompactGraph.from_graph(self.graph, edge_labels=True).to_graph()
+
+        self.assertEqual(sorted(node.label for node in graph.nodes), ['a', 'b', 'c', 'd'])
+        self.assertEqual(len(graph.edges), 5)
+        self.assertEqual(len(graph.get_node_by_label('a').get_edges_by_label('parallel')), 1)
+        self.assertEqual(len(graph.get_node_by_label('d').edges), 2)  # Self-loops are listed twice.
+
+    def test_unknown_label(self):
+        """Test that looking up a missing label raises GraphException."""
+        self._setup_basic_graph()
+        compact = CompactGraph.from_graph(self.graph)
+
+        self.assertRaises(GraphException, compact.get_index_by_label, 'z')
+
+    def test_bfs_matches_graph(self):
+        """Test that BFS over the CSR arrays explores the same nodes in the same layers as Graph."""
+        self._setup_basic_graph()
+        self.node_c = self.graph.add_node_by_label('c')
+        self.node_d = self.graph.add_node_by_label('d')
+        self.graph.add_node_by_label('e')  # Unconnected node
+        self.graph.add_edge_by_label('a', 'c')
+        self.graph.add_edge_by_label('b', 'd')
+        compact = CompactGraph.from_graph(self.graph)
+
+        for end in [self.node_d, self.graph.get_node_by_label('e')]:
+            found, explored = self.graph.breadth_first_search(self.node_a, end)
+            compact_found, compact_explored = compact.breadth_first_search(
+                compact.get_index_by_label('a'), compact.get_index_by_label(end.label))
+
+            self.assertEqual(compact_found, found)
+            self.assertEqual([(compact.labels[index], layer) for index, layer in compact_explored],
+                             [(node.label, layer) for node, layer in explored])
+
+    def test_shortest_path(self):
+        """Test that shortest_path returns the node indices along a shortest path."""
+        self._setup_basic_graph()
+        self.graph.add_nodes(['c', 'd', 'e'])
+        self.graph.add_edges([('a', 'c'), ('b', 'd'), ('c', 'd')])
+        compact = CompactGraph.from_graph(self.graph)
+        a, b, d, e = (compact.get_index_by_label(label) for label in 'abde')
+
+        self.assertEqual(compact.shortest_path(a, d), [a, b, d])
+        self.assertEqual(compact.shortest_path(a, a), [a])
+        self.assertEqual(compact.shortest_path(a, e), [])
+
+    def test_bfs_connected_regions(self):
+        """Test that the CSR connected regions algorithm correctly counts regions."""
+        self._setup_triangle_graph()
+        self.graph.add_node_by_label('d')
+        self.graph.add_node_by_label('e')
+        self.graph.add_edge_by_label('d', 'e')
+        self.graph.add_node_by_label('f')
+        compact = CompactGraph.from_graph(self.graph)
+
+        regions = compact.bfs_connected_regions()
+
+        self.assertEqual([sorted(compact.labels[i] for i in region) for region in regions],
+                         [['a', 'b', 'c'], ['d', 'e'], ['f']])
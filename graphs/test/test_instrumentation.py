@@ -0,0 +1,78 @@
+import logging
+import unittest
+from graphs import instrumentation
+from graphs.compact import CompactGraph
+from graphs.instrumentation import Stats, count_layers
+from graphs.primitives import Graph
+
+_log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def _setup_path_graph(self):
+        """A path a-b-c-d, plus an isolated node e."""
+        graph = Graph()
+        graph.add_nodes(['a', 'b', 'c', 'd', 'e'])
+        graph.add_edges([('a', 'b'), ('b', 'c'), ('c', 'd')])
+        return graph
+
+    def test_no_hook(self):
+        """Test that searches run normally and nothing is recorded when no hook is attached."""
+        graph = self._setup_path_graph()
+        stats = Stats()
+        with instrumentation.attached(stats):
+            graph.breadth_first_search(graph.get_node_by_label('a'))
+        recorded = dict(stats.counters)
+        self.assertTrue(recorded)
+
+        # Once detached, the same search must leave the stats untouched.
+        self.assertIsNone(instrumentation.hook)
+        found, explored = graph.breadth_first_search(graph.get_node_by_label('a'))
+        self.assertFalse(found)
+        self.assertEqual(len(explored), 4)
+        self.assertEqual(stats.counters, recorded)
+
+    def test_breadth_first_search(self):
+        """Test that BFS reports the nodes expanded, edges scanned and frontier size per layer."""
+        graph = self._setup_path_graph()
+        compact = CompactGraph.from_graph(graph)
+
+        with instrumentation.attached(Stats()) as stats:
+            graph.breadth_first_search(graph.get_node_by_label('b'))
+            compact.breadth_first_search(compact.get_index_by_label('b'))
+        self.assertIsNone(instrumentation.hook)
+
+        self.assertEqual(stats.counters['bfs searches'], 1)
+        self.assertEqual(stats.counters['bfs nodes expanded'], 4)
+        self.assertEqual(stats.counters['bfs edges scanned'], 6)
+        self.assertEqual(stats.layer_sizes['bfs'], [1, 2, 1])
+        self.assertEqual(stats.counters['compact bfs edges scanned'], 6)
+        self.assertEqual(stats.layer_sizes['compact bfs'], [1, 2, 1])
+
+    def test_bidirectional_search(self):
+        """Test that bidirectional search reports the size of each frontier it expands."""
+        graph = self._setup_path_graph()
+
+        with instrumentation.attached(Stats()) as stats:
+            distance, _ = graph.bidirectional_search(graph.get_node_by_label('a'), graph.get_node_by_label('d'))
+
+        self.assertEqual(distance, 3)
+        self.assertEqual(stats.counters['bidirectional searches'], 1)
+        self.assertEqual(sum(stats.layer_sizes['bidirectional']), stats.counters['bidirectional nodes expanded'])
+
+    def test_report(self):
+        """Test that the report lists counters, frontier sizes and phase times."""
+        stats = Stats()
+        stats.count('lines parsed', 3)
+        stats.record_search('bfs', 3, 4, count_layers([0, 1, 1]))
+        stats.record_search('bfs', 1, 0, [1])
+        with instrumentation.attached(stats):
+            with instrumentation.phase('search'):
+                pass
+
+        report = stats.report()
+        self.assertIn('lines parsed: 3', report)
+        self.assertIn('bfs searches: 2', report)
+        self.assertIn('bfs frontier sizes: 2 2', report)
+        self.assertTrue(report[-1].startswith('search time: '))
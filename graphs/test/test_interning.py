@@ -0,0 +1,27 @@
+import logging
+import unittest
+from graphs.interning import Interner, InterningException
+
+_log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestInterner(unittest.TestCase):
+    def test_intern(self):
+        """Test that IDs are dense, in order of first appearance, and resolve back to their strings."""
+        interner = Interner(['b', 'a'])
+
+        self.assertEqual([interner.intern(string) for string in ['a', 'c', 'b', 'c']], [1, 2, 0, 2])
+        self.assertEqual(len(interner), 3)
+        self.assertEqual([interner[string_id] for string_id in range(3)], ['b', 'a', 'c'])
+        self.assertIn('c', interner)
+        self.assertNotIn('d', interner)
+
+    def test_get_id(self):
+        """Test that looking up a string doesn't intern it."""
+        interner = Interner(['a'])
+
+        self.assertEqual(interner.get_id('a'), 0)
+        with self.assertRaises(InterningException):
+            interner.get_id('b')
+        self.assertEqual(len(interner), 1)
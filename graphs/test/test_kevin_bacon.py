@@ -1,9 +1,24 @@
 import logging
+from contextlib import redirect_stdout
 from copy import deepcopy
+from io import StringIO
+import os
+import tempfile
 from unittest.case import TestCase
 from unittest.mock import MagicMock
+from docopt import docopt
+from graphs import kevin_bacon
 from graphs.kevin_bacon import _seek_to_actors, _read_next_actor, BaconException, _create_actor_graph, \
-    _find_hops_to_kevin
+    _find_hops_to_kevin, _find_path_to_kevin, _iter_actors, _read_actor_file, _shard_actor_file, _create_bipartite_graph, _title_label, \
+    _find_hops_in_snapshot, _batch_hops, _batch_hops_from_index, _write_batch_results, _read_actor_names, \
+    _credit_filter_from_arguments, CreditFilter, _create_interned_graph, _get_actor_node, _run, \
+    _build_bacon_index, BACON, find_actor_path
+from graphs import instrumentation
+from graphs.bacon_index import BaconIndex
+from graphs.compact import CompactGraph
+from graphs.instrumentation import Stats
+from graphs.interning import Interner
+from graphs.primitives import GraphException
 
 _log = logging.getLogger(__name__)
 logging.basicConfig(level=logging.DEBUG)
@@ -28,6 +43,15 @@ Aanderson, Chris\t\tDecoys 2: Alien Seduction (2007) (V)  [Guard]  <22>
 
 """
 
+ACTOR_LIST_HEADER = """CRC: 0x6E7ED2AE  File: actors.list  Date: Fri Dec 19 00:00:00 2014
+
+THE ACTORS LIST
+===============
+
+Name			Titles
+----			------
+"""
+
 LINKED_ACTORS_DICT = {
     'Alice': [
         'Film 1',
@@ -94,6 +118,160 @@ class TestKevinBacon(TestCase):
             ]
         )
         
+    def test_read_next_actor_eof(self):
+        """Test that _read_next_actor returns (None, None) at the end of the file instead of looping."""
+        actor_file = StringIO('ACTOR\t\tTITLE 1 (2000)\n')
+
+        self.assertEqual(_read_next_actor(actor_file), ('ACTOR', ['TITLE 1']))
+        self.assertEqual(_read_next_actor(actor_file), (None, None))
+
+    def test_read_next_actor_end_of_list(self):
+        """Test that _read_next_actor returns (None, None) at the rule which ends the actors list."""
+        actor_file = StringIO('ACTOR\t\tTITLE 1 (2000)\n\n' + '-' * 77 + '\n\nSUBMITTING UPDATES\n')
+
+        self.assertEqual(_read_next_actor(actor_file), ('ACTOR', ['TITLE 1']))
+        self.assertEqual(_read_next_actor(actor_file), (None, None))
+
+    def test_iter_actors(self):
+        """Test that _iter_actors streams every actor, whatever the block boundaries."""
+        expected = [
+            ('Aanaahad', ['Akki, Vikki te Nikki', 'Lahore']),
+            ('Aanderaa, Torgny Gerhard', ['Citizen X']),
+            ('Bob', ['Film 1']),
+        ]
+        actor_list = ACTOR_LIST_HEADER + ACTOR_SAMPLE.split('\n\n')[0] + '\n\n' + \
+            'Aanderaa, Torgny Gerhard\t\tCitizen X (2007)  [The drug-addict]\n\n\n' + \
+            'Bob\t\tFilm 1 (2000)\n'
+
+        for block_size in [1, 7, 64, 1 << 20]:
+            actors = list(_iter_actors(StringIO(actor_list), block_size=block_size))
+            self.assertEqual(actors, expected)
+
+    def test_iter_actors_end_of_list(self):
+        """Test that _iter_actors stops at the rule which ends the actors list."""
+        actor_list = ACTOR_LIST_HEADER + 'Bob\t\tFilm 1 (2000)\n\n' + '-' * 77 + '\n\nSUBMITTING UPDATES\n'
+
+        self.assertEqual(list(_iter_actors(StringIO(actor_list))), [('Bob', ['Film 1'])])
+
+    def test_iter_actors_credit_filter(self):
+        """Test that credits are dropped by media type, year and billing while parsing."""
+        actor_list = ACTOR_LIST_HEADER + ACTOR_SAMPLE.split('\n\n')[1] + '\n\n'
+        parse = lambda credit_filter: list(_iter_actors(StringIO(actor_list), credit_filter=credit_filter))
+        actor = 'Aanderaa, Torgny Gerhard'
+
+        self.assertEqual(parse(CreditFilter(exclude_media=['video-game', 'series', 'episode'])),
+                         [(actor, ['Citizen X', 'Kommandør Treholt & ninjatroppen', 'Regimet'])])
+        self.assertEqual(parse(CreditFilter(exclude_media=['film'])),
+                         [(actor, ['The Secret World', '"Drømmen om Norge"', '"Helt perfekt"'])])
+        self.assertEqual(parse(CreditFilter(min_year=2010, max_year=2011)),
+                         [(actor, ['Kommandør Treholt & ninjatroppen', 'Regimet', '"Helt perfekt"'])])
+        self.assertEqual(parse(CreditFilter(max_billing=3)), [(actor, ['Regimet'])])
+        self.assertEqual(parse(CreditFilter(max_year=2000)), [(actor, [])])
+
+    def test_credit_filter(self):
+        """Test the media type of each kind of credit, and filters built from the command line."""
+        credit_filter = CreditFilter(exclude_media=['tv-movie', 'video', 'episode'])
+
+        self.assertFalse(credit_filter.accepts('Decoys 2: Alien Seduction (2007) (V)  [Guard]  <22>'))
+        self.assertFalse(credit_filter.accepts("High Noon (2009) (TV)  [Detective 'Bull' Sykes]  <23>"))
+        self.assertFalse(credit_filter.accepts('"Heartland" (2007/II) {Man\'s Best Friend (#3.3)}  [Dwayne]  <14>'))
+        self.assertTrue(credit_filter.accepts('"Heartland" (2007/II)  [Dwayne]'))
+        self.assertTrue(credit_filter.accepts('Saw (V) (2004/I)  [Amanda]'))
+        self.assertFalse(CreditFilter(min_year=1900).accepts('Untitled (????)'))
+        self.assertRaises(BaconException, CreditFilter, exclude_media=['radio'])
+
+        options = {'--exclude': 'video-game, episode', '--years': '1980-', '--max-billing': '5'}
+        credit_filter = _credit_filter_from_arguments(options)
+        self.assertEqual((credit_filter.exclude_media, credit_filter.min_year, credit_filter.max_year,
+                          credit_filter.max_billing), ({'video-game', 'episode'}, 1980, None, 5))
+        self.assertIsNone(_credit_filter_from_arguments({'--exclude': None, '--years': None, '--max-billing': None}))
+        self.assertRaises(BaconException, _credit_filter_from_arguments,
+                          {'--exclude': None, '--years': '1980s', '--max-billing': None})
+
+    def test_credit_filter_with_saved_graph(self):
+        """Test that credit filters are refused for queries answered from a saved index or snapshot."""
+        for argv in [['--index=bacon.idx', 'Bob'], ['--snapshot=actors.snp', 'Bob'],
+                     ['--index=bacon.idx', '--batch=-'], ['--distribution']]:
+            arguments = docopt(kevin_bacon.__doc__, argv=['--exclude=video-game'] + argv)
+            self.assertRaises(BaconException, _run, arguments)
+
+    def test_default_index(self):
+        """Test that queries use bacon.idx when it exists, unless credit filters are given."""
+        actors_dict = deepcopy(LINKED_ACTORS_DICT)
+        actors_dict[BACON] = ['Film 1']
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                _build_bacon_index(actors_dict).save('bacon.idx')
+                output = StringIO()
+                with redirect_stdout(output):
+                    _run(docopt(kevin_bacon.__doc__, argv=['Dan']))
+                # There's no actor list to parse, so a filtered query can't have used the index.
+                with self.assertRaises(FileNotFoundError):
+                    _run(docopt(kevin_bacon.__doc__, argv=['--exclude=video-game', 'Dan']))
+            finally:
+                os.chdir(cwd)
+
+        self.assertEqual(output.getvalue(), 'Found path in 2 hops.\n')
+
+    def test_read_actor_file_parallel_credit_filter(self):
+        """Test that worker processes apply the credit filter too."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = self._write_actor_list(directory)
+            actors = list(_read_actor_file(path, workers=2, credit_filter=CreditFilter(min_year=2001)))
+
+        self.assertEqual(len(actors), 50)
+        self.assertEqual(actors[7], ('Actor 7', ['Film 1']))
+
+    def _write_actor_list(self, directory):
+        """Write a list of 50 actors, with a footer that can't be parsed after the closing rule."""
+        path = os.path.join(directory, 'actors.list')
+        records = ''.join('Actor %s\t\tFilm %s (2000)\n\t\tFilm %s (2001)  [Role]\n\n' % (i, i % 7, i % 3)
+                          for i in range(50))
+        with open(path, 'w', encoding='latin1') as actor_file:
+            actor_file.write(ACTOR_LIST_HEADER + records + '-' * 77 + '\n\nSUBMITTING UPDATES\n\nFooter\n')
+        return path
+
+    def test_shard_actor_file(self):
+        """Test that shards cover the whole actors list and split it only at record boundaries."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = self._write_actor_list(directory)
+            shards = _shard_actor_file(path, 8)
+            with open(path, 'rb') as actor_file:
+                data = actor_file.read()
+
+        self.assertEqual(len(shards), 8)
+        for (_, end), (start, _) in zip(shards, shards[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[start - 2:start], b'\n\n')
+        self.assertTrue(data[shards[-1][1]:].startswith(b'-' * 77))
+
+    def test_read_actor_file_parallel(self):
+        """Test that parsing with a process pool gives exactly the single-process result."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = self._write_actor_list(directory)
+            expected = list(_read_actor_file(path))
+            actors = list(_read_actor_file(path, workers=3))
+
+        self.assertEqual(len(expected), 50)
+        self.assertEqual(actors, expected)
+
+    def test_read_actor_file_stats(self):
+        """Test that reading the actors list counts actors, lines parsed and credits kept when stats are attached."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = self._write_actor_list(directory)
+            for workers in [1, 2]:
+                with instrumentation.attached(Stats()) as stats:
+                    credit_filter = CreditFilter(min_year=2001)
+                    actors = list(_read_actor_file(path, workers=workers, credit_filter=credit_filter))
+
+                self.assertEqual(len(actors), 50)
+                self.assertEqual(stats.counters['actors parsed'], 50)
+                self.assertEqual(stats.counters['lines parsed'], 100)
+                self.assertEqual(stats.counters['credits kept'], 50)
+                self.assertIn('parse', stats.phase_times)
+
     def test_read_next_actor_bad_actor(self):
         """Test that _read_next_actor correctly complains on malformatted actor name."""
         m_file = MagicMock()
@@ -134,4 +312,126 @@ class TestKevinBacon(TestCase):
         actors_dict['Bacon, Kevin (I)'] = ["Film 1"]
         hops = _find_hops_to_kevin(actors_dict, "Dan")
 
-        self.assertEquals(hops, 2)
\ No newline at end of file
+        self.assertEquals(hops, 2)
+
+    def test_create_actor_graph_from_stream(self):
+        """Test that _create_actor_graph accepts a stream of (actor, titles) tuples."""
+        graph = _create_actor_graph(iter(LINKED_ACTORS_DICT.items()))
+
+        self.assertEqual([node.label for node in graph.nodes], list(LINKED_ACTORS_DICT))
+        self.assertEqual(len(graph.edges), 4)
+
+    def test_create_bipartite_graph(self):
+        """Test that _create_bipartite_graph joins each actor to a node for each of their titles."""
+        graph = _create_bipartite_graph(LINKED_ACTORS_DICT)
+
+        alice = graph.get_node_by_label('Alice')
+        film_1 = graph.get_node_by_label(_title_label('Film 1'))
+
+        self.assertEqual(len(graph.nodes), 8)  # 4 actors and 4 titles
+        self.assertEqual(len(graph.edges), 7)  # One per credit
+        self.assertEqual(sorted(edge.label for edge in alice.edges), ['Film 1', 'Film 2'])
+        self.assertEqual(sorted(edge.get_other_node(film_1).label for edge in film_1.edges),
+                         ['Alice', 'Bob', 'Claire'])
+
+    def test_create_interned_graph(self):
+        """Test that interned graphs of either model label nodes and edges with IDs that resolve to names."""
+        for bipartite, node_count in [(False, 4), (True, 8)]:
+            interner = Interner()
+            graph = _create_interned_graph(LINKED_ACTORS_DICT, interner, bipartite=bipartite)
+            alice = _get_actor_node(graph, interner, 'Alice')
+
+            self.assertEqual(len(graph.nodes), node_count)
+            self.assertTrue(all(isinstance(node.label, int) for node in graph.nodes))
+            self.assertEqual(interner[alice.label], 'Alice')
+            self.assertEqual(sorted(interner[edge.label] for edge in alice.edges)[0], 'Film 1')
+            if bipartite:
+                film_1 = graph.get_node_by_label(interner.get_id(_title_label('Film 1')))
+                self.assertEqual(len(film_1.edges), 3)
+            with self.assertRaises(GraphException):
+                _get_actor_node(graph, interner, 'Nobody')
+
+    def test_find_hops_to_kevin_bipartite(self):
+        """Test that _find_hops_to_kevin counts actor hops, not graph hops, in the bipartite model."""
+        actors_dict = deepcopy(LINKED_ACTORS_DICT)
+        actors_dict['Bacon, Kevin (I)'] = ["Film 1"]
+
+        self.assertEqual(_find_hops_to_kevin(actors_dict, "Dan", bipartite=True), 2)
+        self.assertEqual(_find_hops_to_kevin(actors_dict, "Bacon, Kevin (I)", bipartite=True), 0)
+
+    def test_find_path_to_kevin(self):
+        """Test that the path to Kevin Bacon names the title linking each pair of actors, in both graph models."""
+        actors_dict = deepcopy(LINKED_ACTORS_DICT)
+        actors_dict['Bacon, Kevin (I)'] = ["Film 1"]
+
+        for bipartite in [False, True]:
+            self.assertEqual(_find_path_to_kevin(actors_dict, "Dan", bipartite=bipartite),
+                             ['Dan', 'Film 3', 'Bob', 'Film 1', 'Bacon, Kevin (I)'])
+            self.assertEqual(_find_path_to_kevin(actors_dict, "Bacon, Kevin (I)", bipartite=bipartite),
+                             ['Bacon, Kevin (I)'])
+
+        actors_dict['Bacon, Kevin (I)'] = ["Film 5"]
+        self.assertIsNone(_find_path_to_kevin(actors_dict, "Dan"))
+
+    def test_find_hops_in_snapshot(self):
+        """Test that hops in a compact graph only count actors, whichever graph model it holds."""
+        actors_dict = deepcopy(LINKED_ACTORS_DICT)
+        actors_dict['Bacon, Kevin (I)'] = ["Film 1"]
+
+        for create_graph in [_create_actor_graph, _create_bipartite_graph]:
+            graph = CompactGraph.from_graph(create_graph(actors_dict))
+            self.assertEqual(_find_hops_in_snapshot(graph, "Dan"), 2)
+            self.assertEqual(_find_hops_in_snapshot(graph, "Alice"), 1)
+
+    def test_find_actor_path(self):
+        """Test that the path in a compact graph runs from the actor to Kevin Bacon through actors only."""
+        actors_dict = deepcopy(LINKED_ACTORS_DICT)
+        actors_dict['Bacon, Kevin (I)'] = ["Film 1"]
+
+        for create_graph in [_create_actor_graph, _create_bipartite_graph]:
+            graph = CompactGraph.from_graph(create_graph(actors_dict))
+            path = find_actor_path(graph, "Dan")
+            self.assertEqual((len(path), path[0], path[-1]), (3, "Dan", BACON))
+            with self.assertRaises(GraphException):
+                find_actor_path(graph, "Nobody")
+        with self.assertRaises(GraphException):
+            find_actor_path(graph, _title_label("Film 1"))
+
+    def test_find_hops_to_kevin_unconnected(self):
+        """Test that _find_hops_to_kevin returns None when there is no path to Kevin Bacon."""
+        actors_dict = deepcopy(LINKED_ACTORS_DICT)
+        actors_dict['Bacon, Kevin (I)'] = ["Film 5"]
+        hops = _find_hops_to_kevin(actors_dict, "Dan")
+
+        self.assertIsNone(hops)
+
+    def test_batch_hops(self):
+        """Test that a batch query reports hops, unconnected actors and unknown names in input order."""
+        actors_dict = deepcopy(LINKED_ACTORS_DICT)
+        actors_dict[BACON] = ['Film 3']
+        actors_dict['Eve'] = ['Film 5']
+        actors = _read_actor_names(StringIO('Alice\n\nNobody\nEve\nDan\n\tFilm 1\n'))
+
+        expected = [('Alice', 2, None), ('Nobody', None, 'Unknown actor.'), ('Eve', None, None), ('Dan', 1, None),
+                    ('\tFilm 1', None, 'Unknown actor.')]
+        self.assertEqual(list(_batch_hops(actors_dict, actors)), expected)
+        self.assertEqual(list(_batch_hops(actors_dict, actors, bipartite=True)), expected)
+
+        index = BaconIndex.build(_create_actor_graph(actors_dict), BACON)
+        self.assertEqual(list(_batch_hops_from_index(index, actors)), expected)
+
+    def test_write_batch_results(self):
+        """Test that batch results are written as CSV or JSON Lines."""
+        results = [('Alice', 2, None), ('Nobody', None, 'Unknown actor.')]
+
+        output = StringIO()
+        _write_batch_results(results, output, 'csv')
+        self.assertEqual(output.getvalue(), 'actor,hops,error\r\nAlice,2,\r\nNobody,,Unknown actor.\r\n')
+
+        output = StringIO()
+        _write_batch_results(results, output, 'jsonl')
+        self.assertEqual(output.getvalue(), '{"actor": "Alice", "hops": 2}\n'
+                                            '{"actor": "Nobody", "hops": null, "error": "Unknown actor."}\n')
+
+        with self.assertRaises(BaconException):
+            _write_batch_results(iter(results), StringIO(), 'xml')
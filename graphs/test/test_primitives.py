@@ -1,6 +1,7 @@
+from copy import deepcopy
 import logging
 import unittest
-from graphs.primitives import Graph, GraphException
+from graphs.primitives import Graph, GraphException, Node, IndexedList, EdgeList
 
 _log = logging.getLogger(__name__)
 logging.basicConfig(level=logging.DEBUG)
@@ -61,6 +62,51 @@ class TestGraph(GraphTestCase):
         self.assertTrue(self.edge_c_a in self.node_a.incident_edges)
         self.assertTrue(self.edge_c_a not in self.node_a.outgoing_edges)
 
+    def test_slots(self):
+        """Test that nodes and edges don't carry a per-instance __dict__."""
+        self._setup_triangle_graph(directed=True)
+        self.graph.add_edge_by_label('a', 'b')
+
+        for obj in [self.node_a, self.edge_a_b, self.graph.edges[-1]]:
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_incident_outgoing_views(self):
+        """Test the incident/outgoing edge views on mixed and self-loop edges."""
+        self._setup_triangle_graph(directed=True)
+        undirected = self.graph.add_edge_by_label('a', 'b')
+        loop = self.graph.add_edge_by_label('a', 'a', directed=True)
+
+        self.assertEqual(list(self.node_a.outgoing_edges), [self.edge_a_b, undirected])
+        self.assertEqual(list(self.node_a.incident_edges), [self.edge_c_a, undirected, loop, loop])
+        self.assertEqual(len(self.node_a.edges), 5)
+        self.assertTrue(undirected in self.node_b.incident_edges)
+        self.assertTrue(loop not in self.node_a.outgoing_edges)
+
+    def test_remove_edge(self):
+        """Test that removing edges updates the graph and both nodes, including self-loops."""
+        self._setup_triangle_graph()
+        loop = self.graph.add_edge_by_label('a', 'a')
+
+        self.graph.remove_edge(self.edge_a_b)
+        self.graph.remove_edge(loop)
+
+        self.assertEqual(len(self.graph.edges), 2)
+        self.assertTrue(self.edge_a_b not in self.node_a.edges)
+        self.assertTrue(self.edge_a_b not in self.node_b.edges)
+        self.assertEqual(list(self.node_a.edges), [self.edge_c_a])
+        self.assertRaises(GraphException, self.graph.remove_edge, self.edge_a_b)
+
+    def test_remove_node(self):
+        """Test that removing nodes updates the node list and the label index."""
+        self._setup_triangle_graph()
+
+        self.graph.remove_node(self.node_a)
+
+        self.assertEqual(sorted(node.label for node in self.graph.nodes), ['b', 'c'])
+        self.assertRaises(GraphException, self.graph.get_node_by_label, 'a')
+        self.assertRaises(GraphException, self.graph.remove_node, self.node_a)
+        self.assertRaises(GraphException, self.graph.add_node, self.node_b)
+
     def test_add_edge_by_label(self):
         """Test that an exception is raised when adding an edge with a non-existant label."""
         self._setup_basic_graph()
@@ -71,6 +117,43 @@ class TestGraph(GraphTestCase):
         self._setup_basic_graph()
         self.assertRaises(GraphException, self.graph.add_node_by_label, 'a')
 
+    def test_get_node_by_label_after_remove(self):
+        """Test that the label index falls back to the next node with the same label on removal."""
+        self._setup_basic_graph()
+        duplicate_a = Node(label='a')
+        self.graph.add_node(duplicate_a)
+
+        self.assertIs(self.graph.get_node_by_label('a'), self.node_a)
+        self.graph.remove_node(self.node_a)
+        self.assertIs(self.graph.get_node_by_label('a'), duplicate_a)
+        self.graph.remove_node(duplicate_a)
+        self.assertRaises(GraphException, self.graph.get_node_by_label, 'a')
+
+    def test_add_nodes(self):
+        """Test that add_nodes adds a batch of nodes, and rejects duplicates without adding any."""
+        self._setup_basic_graph()
+
+        nodes = self.graph.add_nodes(['c', 'd'])
+
+        self.assertEqual([node.label for node in nodes], ['c', 'd'])
+        self.assertIs(self.graph.get_node_by_label('d'), nodes[1])
+        self.assertRaises(GraphException, self.graph.add_nodes, ['e', 'a'])
+        self.assertRaises(GraphException, self.graph.add_nodes, ['e', 'e'])
+        self.assertEqual(len(self.graph.nodes), 4)
+
+    def test_add_edges(self):
+        """Test that add_edges adds a batch of edges, and rejects missing labels without adding any."""
+        self._setup_basic_graph()
+        self.graph.add_node_by_label('c')
+
+        edges = self.graph.add_edges([('a', 'c'), ('b', 'c', 'label')])
+
+        self.assertEqual(len(self.graph.edges), 3)
+        self.assertEqual(edges[1].label, 'label')
+        self.assertTrue(edges[0] in self.node_a.edges)
+        self.assertRaises(GraphException, self.graph.add_edges, [('a', 'b'), ('a', 'z')])
+        self.assertEqual(len(self.graph.edges), 3)
+
     def test_bfs(self):
         """Test Breadth First Search in a graph."""
         self._setup_triangle_graph()
@@ -124,6 +207,96 @@ class TestGraph(GraphTestCase):
             ]
         )
 
+    def test_breadth_first_tree(self):
+        """Test that the BFS tree records the layer and parent edge of every reachable node."""
+        self._setup_basic_graph()
+        self.node_c = self.graph.add_node_by_label('c')
+        self.node_d = self.graph.add_node_by_label('d')
+        self.graph.add_node_by_label('e')  # Unconnected node
+        self.edge_a_c = self.graph.add_edge_by_label('a', 'c')
+        self.edge_b_d = self.graph.add_edge_by_label('b', 'd')
+
+        tree = self.graph.breadth_first_tree(self.node_a)
+
+        self.assertEqual(
+            list(tree.items()),
+            [
+                (self.node_a, (0, None)),
+                (self.node_b, (1, self.edge_a_b)),
+                (self.node_c, (1, self.edge_a_c)),
+                (self.node_d, (2, self.edge_b_d)),
+            ]
+        )
+
+    def test_breadth_first_tree_targets(self):
+        """Test that the BFS tree stops growing once every target has been reached."""
+        self._setup_basic_graph()
+        self.node_c = self.graph.add_node_by_label('c')
+        self.node_d = self.graph.add_node_by_label('d')
+        self.graph.add_edge_by_label('b', 'c')
+        self.graph.add_edge_by_label('c', 'd')
+
+        tree = self.graph.breadth_first_tree(self.node_a, targets=[self.node_b, self.node_a])
+        self.assertEqual(list(tree), [self.node_a, self.node_b])
+
+        tree = self.graph.breadth_first_tree(self.node_a, targets=[self.node_c])
+        self.assertEqual(tree[self.node_c][0], 2)
+        self.assertNotIn(self.node_d, tree)
+
+        tree = self.graph.breadth_first_tree(self.node_a, targets=[])
+        self.assertEqual(list(tree), [self.node_a])
+
+    def test_bidirectional_search(self):
+        """Test that bidirectional search returns the shortest distance and path.
+
+        Uses graph
+
+        a --- b --- d --- e
+        +---- c ----------+
+
+        """
+        self._setup_basic_graph()
+        self.node_c = self.graph.add_node_by_label('c')
+        self.node_d = self.graph.add_node_by_label('d')
+        self.node_e = self.graph.add_node_by_label('e')
+        self.graph.add_edges([('a', 'c'), ('b', 'd'), ('d', 'e'), ('c', 'e')])
+
+        distance, path = self.graph.bidirectional_search(self.node_a, self.node_e)
+
+        self.assertEqual(distance, 2)
+        self.assertEqual(path, [self.node_a, self.node_c, self.node_e])
+
+        distance, path = self.graph.bidirectional_search(self.node_b, self.node_e)
+
+        self.assertEqual(distance, 2)
+        self.assertEqual(path, [self.node_b, self.node_d, self.node_e])
+
+    def test_bidirectional_search_trivial(self):
+        """Test bidirectional search from a node to itself and to an unreachable node."""
+        self._setup_triangle_graph()
+        self.node_d = self.graph.add_node_by_label('d')  # Unconnected node
+
+        self.assertEqual(self.graph.bidirectional_search(self.node_a, self.node_a), (0, [self.node_a]))
+        self.assertEqual(self.graph.bidirectional_search(self.node_a, self.node_b),
+                         (1, [self.node_a, self.node_b]))
+        self.assertEqual(self.graph.bidirectional_search(self.node_a, self.node_d), (None, []))
+
+    def test_bidirectional_path(self):
+        """Test that the bidirectional path gives the edge joining each consecutive pair of nodes."""
+        self._setup_basic_graph()
+        self.node_c = self.graph.add_node_by_label('c')
+        self.node_d = self.graph.add_node_by_label('d')
+        self.node_e = self.graph.add_node_by_label('e')  # Unconnected node
+        edge_b_c = self.graph.add_edge_by_label('b', 'c', 'bc')
+        edge_d_c = self.graph.add_edge_by_label('d', 'c', 'dc')
+
+        nodes, edges = self.graph.bidirectional_path(self.node_a, self.node_d)
+
+        self.assertEqual(nodes, [self.node_a, self.node_b, self.node_c, self.node_d])
+        self.assertEqual(edges, [self.edge_a_b, edge_b_c, edge_d_c])
+        self.assertEqual(self.graph.bidirectional_path(self.node_a, self.node_a), ([self.node_a], []))
+        self.assertEqual(self.graph.bidirectional_path(self.node_a, self.node_e), ([], []))
+
     def test_bfs_connected_regions(self):
         """Test that the BFS connected regions algorithm correctly counts regions."""
         # Region 1 (a,b,c)
@@ -139,4 +312,170 @@ class TestGraph(GraphTestCase):
 
         regions = self.graph.bfs_connected_regions()
 
-        self.assertEqual(len(regions), 3)
\ No newline at end of file
+        self.assertEqual(len(regions), 3)
+        self.assertEqual([sorted(node.label for node in region) for region in regions],
+                         [['a', 'b', 'c'], ['d', 'e'], ['f']])
+
+    def test_component_index(self):
+        """Test that the component index tracks added nodes and edges, and survives removals."""
+        self._setup_basic_graph()
+        self.graph.add_node_by_label('c')
+        self.assertRaises(GraphException, self.graph.connected, 'a', 'b')
+        self.graph.enable_component_index()
+
+        self.assertTrue(self.graph.connected('a', 'b'))
+        self.assertFalse(self.graph.connected('a', 'c'))
+
+        self.graph.add_nodes(['d', 'e'])
+        self.graph.add_edge_by_label('c', 'd')
+        self.graph.add_edges([('d', 'b')])
+
+        self.assertTrue(self.graph.connected('a', 'c'))
+        self.assertEqual(self.graph.component_size('a'), 4)
+        self.assertEqual(self.graph.component_size('e'), 1)
+
+        self.graph.remove_edge(self.edge_a_b)
+
+        self.assertFalse(self.graph.connected('a', 'c'))
+        self.assertEqual(self.graph.component_size('c'), 3)
+        self.assertRaises(GraphException, self.graph.component_size, 'z')
+
+
+    def test_fingerprint(self):
+        """Test that copies share a fingerprint, and it ignores order and undirected edge orientation."""
+        self._setup_triangle_graph()
+        reordered = Graph()
+        reordered.add_nodes(['c', 'b', 'a'])
+        reordered.add_edges([('a', 'c'), ('c', 'b'), ('b', 'a')])
+
+        self.assertEqual(self.graph.fingerprint(), deepcopy(self.graph).fingerprint())
+        self.assertTrue(self.graph.structurally_equal(deepcopy(self.graph)))
+        self.assertTrue(self.graph.structurally_equal(reordered))
+        self.assertNotEqual(self.graph, reordered)
+
+    def test_fingerprint_differs(self):
+        """Test that labels, direction and parallel edges all change the fingerprint."""
+        self._setup_triangle_graph()
+        directed = deepcopy(self.graph)
+        self._setup_triangle_graph(directed=True)
+
+        self.assertFalse(self.graph.structurally_equal(directed))
+
+        fingerprint = self.graph.fingerprint()
+        parallel = self.graph.add_edge_by_label('a', 'b')
+        self.assertNotEqual(self.graph.fingerprint(), fingerprint)
+
+        fingerprint = self.graph.fingerprint()
+        self.graph.remove_edge(parallel)
+        self.graph.add_edge_by_label('a', 'b', edge_label='label')
+        self.assertNotEqual(self.graph.fingerprint(), fingerprint)
+        self.assertFalse(self.graph.structurally_equal(None))
+
+
+class TestDirectedTraversal(GraphTestCase):
+    def _setup_directed_graph(self):
+        """Components {a, b, c} and {d, e}, with edges a->b->c->a, c->d, d<->e and e->f, plus a self-loop on f.
+
+        Node g has an edge to a, but none back.
+        """
+        self.graph = Graph()
+        self.graph.add_nodes('abcdefg')
+        self.graph.add_edges([('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd'), ('d', 'e'), ('e', 'd'), ('e', 'f'),
+                              ('f', 'f'), ('g', 'a')], directed=True)
+
+    def _labels(self, nodes):
+        return [node.label for node in nodes]
+
+    def test_directed_edge(self):
+        """Test that a directed edge finds its other end and can be removed from the graph."""
+        self._setup_triangle_graph(directed=True)
+
+        self.assertIs(self.edge_a_b.get_other_node(self.node_a), self.node_b)
+        self.assertIs(self.edge_a_b.get_other_node(self.node_b), self.node_a)
+        with self.assertRaises(GraphException):
+            self.edge_a_b.get_other_node(self.node_c)
+
+        self.graph.remove_edge(self.edge_a_b)
+        self.assertNotIn(self.edge_a_b, self.node_a.edges)
+        self.assertNotIn(self.edge_a_b, self.node_b.edges)
+        self.assertEqual(len(self.graph.edges), 2)
+
+    def test_directed_breadth_first_search(self):
+        """Test that directed BFS only follows edges from tail to head."""
+        self._setup_directed_graph()
+        node_c, node_g = self.graph.get_node_by_label('c'), self.graph.get_node_by_label('g')
+
+        found, explored = self.graph.directed_breadth_first_search(node_c, end=node_g)
+        self.assertFalse(found)
+        self.assertEqual([(node.label, layer) for node, layer in explored],
+                         [('c', 0), ('a', 1), ('d', 1), ('b', 2), ('e', 2), ('f', 3)])
+
+        found, explored = self.graph.directed_breadth_first_search(node_g, end=node_c)
+        self.assertTrue(found)
+        self.assertEqual(explored[-1], (node_c, 3))
+
+    def test_depth_first_search(self):
+        """Test that DFS visits nodes in recursive order, following direction only when asked to."""
+        self._setup_directed_graph()
+        node_d = self.graph.get_node_by_label('d')
+
+        self.assertEqual(self._labels(self.graph.depth_first_search(node_d)), ['d', 'e', 'f'])
+        self.assertEqual(self._labels(self.graph.depth_first_search(node_d, directed=False)),
+                         ['d', 'c', 'b', 'a', 'g', 'e', 'f'])
+
+    def test_strongly_connected_components(self):
+        """Test that SCCs are found, in reverse topological order."""
+        self._setup_directed_graph()
+
+        components = self.graph.strongly_connected_components()
+
+        self.assertEqual([sorted(self._labels(component)) for component in components],
+                         [['f'], ['d', 'e'], ['a', 'b', 'c'], ['g']])
+
+    def test_long_chain(self):
+        """Test that DFS and SCC don't recurse, on a cycle far longer than the recursion limit."""
+        length = 20000
+        self.graph = Graph()
+        self.graph.add_nodes(range(length))
+        self.graph.add_edges(((i, (i + 1) % length) for i in range(length)), directed=True)
+
+        self.assertEqual(len(self.graph.depth_first_search(self.graph.get_node_by_label(0))), length)
+        self.assertEqual([len(component) for component in self.graph.strongly_connected_components()], [length])
+
+        self.graph.remove_edge(self.graph.edges[-1])
+        self.assertEqual(len(self.graph.strongly_connected_components()), length)
+
+
+class TestIndexedList(unittest.TestCase):
+    def test_remove(self):
+        """Test that removal swaps in the last item and keeps positions consistent."""
+        items = IndexedList('abcd')
+
+        items.remove('b')
+        items.remove('d')
+
+        self.assertEqual(list(items), ['a', 'c'])
+        self.assertEqual(items[1], 'c')
+        self.assertTrue('c' in items)
+        self.assertTrue('b' not in items)
+        self.assertRaises(LookupError, items.remove, 'b')
+        self.assertRaises(ValueError, items.append, 'a')
+
+
+class TestEdgeList(unittest.TestCase):
+    def test_multiplicity(self):
+        """Test that an edge appended twice is iterated twice and must be removed twice."""
+        edges = EdgeList()
+        edges.append('loop')
+        edges.append('other')
+        edges.append('loop')
+
+        self.assertEqual(list(edges), ['loop', 'loop', 'other'])
+        self.assertEqual(len(edges), 3)
+
+        edges.remove('loop')
+        self.assertTrue('loop' in edges)
+        edges.remove('loop')
+        self.assertTrue('loop' not in edges)
+        self.assertRaises(ValueError, edges.remove, 'loop')
+        self.assertEqual(len(edges), 1)
\ No newline at end of file
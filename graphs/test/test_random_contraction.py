@@ -2,7 +2,10 @@ from copy import deepcopy, copy
 import logging
 from unittest.mock import patch
 from graphs.primitives import Graph
-from graphs.random_contraction import run_random_contraction_algorithm, _get_random_edge, _merge_nodes
+from graphs.random_contraction import run_random_contraction_algorithm, _get_random_edge, _merge_nodes, \
+    run_karger_stein_algorithm, _collapse_edges, _contract, _edge_list, run_union_find_contraction_algorithm, \
+    _run_contraction_trial, run_parallel_contraction_algorithm, _trials_for_confidence, ContractionException
+from graphs.union_find import DisjointSet
 from graphs.test.test_primitives import GraphTestCase
 
 logging.basicConfig(level=logging.DEBUG)
@@ -56,8 +59,7 @@ class TestRandomContraction(GraphTestCase):
 
         self.assertEqual(min_edges, 2)
 
-    def test_grid_contraction(self):
-        """Test the random contraction algorithm in the non-trivial case of a square grid."""
+    def _setup_grid_graph(self):
         self.graph = Graph()
 
         self.a = self.graph.add_node_by_label('a')
@@ -71,6 +73,132 @@ class TestRandomContraction(GraphTestCase):
         self.d_a = self.graph.add_edge_by_label('d', 'a')
         self.a_c = self.graph.add_edge_by_label('a', 'c')
 
+    def _setup_barbell_graph(self):
+        """Two 6-node cliques joined by a single edge, so the min cut is 1."""
+        self.graph = Graph()
+        for clique in ['l', 'r']:
+            labels = ['%s%s' % (clique, i) for i in range(6)]
+            self.graph.add_nodes(labels)
+            self.graph.add_edges((tail, head) for i, tail in enumerate(labels) for head in labels[i + 1:])
+        self.graph.add_edge_by_label('l0', 'r0')
+
+    def test_grid_contraction(self):
+        """Test the random contraction algorithm in the non-trivial case of a square grid."""
+        self._setup_grid_graph()
+
         min_edges = run_random_contraction_algorithm(self.graph)
 
         self.assertEqual(min_edges, 2)
+
+    def test_contract(self):
+        """Test that _contract merges down to the target node count, merges parallel edges and drops self-loops."""
+        self._setup_grid_graph()
+        node_count, edges = _edge_list(self.graph)
+        edges = _collapse_edges(edges)
+
+        contracted_count, contracted_edges = _contract(node_count, edges, 2)
+
+        self.assertEqual(contracted_count, 2)
+        self.assertEqual(len(contracted_edges), 1)
+        tail, head, weight = contracted_edges[0]
+        self.assertEqual(sorted([tail, head]), [0, 1])
+        self.assertTrue(2 <= weight <= 3)
+        self.assertEqual(len(edges), 5)  # The input is untouched.
+
+    def test_collapse_edges(self):
+        """Test that parallel edges are merged into weights, whichever way round they run."""
+        self.assertEqual(sorted(_collapse_edges([(0, 1), (1, 0), (1, 2), (2, 2)])), [(0, 1, 2), (1, 2, 1)])
+
+    def test_karger_stein(self):
+        """Test the Karger-Stein algorithm on the triangle, grid and two-node graphs."""
+        self._setup_triangle_graph()
+        self.assertEqual(run_karger_stein_algorithm(self.graph), 2)
+
+        self._setup_grid_graph()
+        self.assertEqual(run_karger_stein_algorithm(self.graph), 2)
+
+        self._setup_basic_graph()
+        self.assertEqual(run_karger_stein_algorithm(self.graph), 1)
+
+    def test_karger_stein_recursive(self):
+        """Test the Karger-Stein algorithm on a graph large enough to recurse."""
+        self._setup_barbell_graph()
+
+        self.assertEqual(run_karger_stein_algorithm(self.graph), 1)
+
+
+    def test_karger_stein_disconnected(self):
+        """Test that the Karger-Stein algorithm finds an empty cut when contraction runs out of edges."""
+        self.graph = Graph()
+        self.graph.add_nodes(range(8))
+        self.graph.add_edge_by_label(0, 1)
+
+        self.assertEqual(run_karger_stein_algorithm(self.graph), 0)
+
+    def test_contraction_trial(self):
+        """Test that a union-find trial leaves two components and counts the edges between them."""
+        self._setup_grid_graph()
+        node_count, edges = _edge_list(self.graph)
+        sets = DisjointSet(node_count)
+
+        cut = _run_contraction_trial(edges, list(range(len(edges))), sets)
+
+        self.assertEqual(sets.count, 2)
+        self.assertEqual(cut, sum(1 for tail, head in edges if not sets.connected(tail, head)))
+
+    def test_union_find_contraction(self):
+        """Test the union-find contraction algorithm, and that it leaves the input graph untouched."""
+        self._setup_triangle_graph()
+        self.assertEqual(run_union_find_contraction_algorithm(self.graph), 2)
+
+        self._setup_grid_graph()
+        self.assertEqual(run_union_find_contraction_algorithm(self.graph), 2)
+        self.assertEqual(len(self.graph.nodes), 4)
+        self.assertEqual(len(self.graph.edges), 5)
+
+        self._setup_barbell_graph()
+        self.assertEqual(run_union_find_contraction_algorithm(self.graph), 1)
+
+    def test_parallel_contraction(self):
+        """Test that parallel trials find the min cut and the partition that achieves it."""
+        self._setup_barbell_graph()
+
+        cut, (side, other_side) = run_parallel_contraction_algorithm(self.graph, workers=2)
+
+        self.assertEqual(cut, 1)
+        self.assertEqual({frozenset(side), frozenset(other_side)},
+                         {frozenset('l%s' % i for i in range(6)), frozenset('r%s' % i for i in range(6))})
+
+    def test_parallel_contraction_reproducible(self):
+        """Test that a seeded run gives the same result in-process and across a pool."""
+        self._setup_grid_graph()
+
+        serial = run_parallel_contraction_algorithm(self.graph, trials=200, workers=1, seed=7)
+        parallel = run_parallel_contraction_algorithm(self.graph, trials=200, workers=3, seed=7)
+
+        self.assertEqual(serial, parallel)
+        cut, (side, _) = serial
+        self.assertEqual(cut, 2)
+        self.assertEqual(cut, sum(1 for edge in self.graph.edges
+                                  if (edge.tail.label in side) != (edge.head.label in side)))
+
+    def test_parallel_contraction_disconnected(self):
+        """Test that a disconnected graph stops at the first zero cut."""
+        self._setup_basic_graph()
+        self.graph.add_node_by_label('c')
+
+        self.assertEqual(run_parallel_contraction_algorithm(self.graph, workers=1), (0, ({'a', 'b'}, {'c'})))
+
+    def test_parallel_contraction_bad_arguments(self):
+        """Test that a trial count below 1 or a confidence outside (0, 1) is rejected up front."""
+        self._setup_triangle_graph()
+
+        for arguments in [{'trials': 0}, {'confidence': 1.0}, {'confidence': 0}]:
+            with self.assertRaises(ContractionException):
+                run_parallel_contraction_algorithm(self.graph, workers=1, **arguments)
+
+    def test_trials_for_confidence(self):
+        """Test the number of trials needed to reach a target success probability."""
+        self.assertEqual(_trials_for_confidence(2, 0.99), 1)
+        # Each trial on 4 nodes succeeds with probability 1/6.
+        self.assertEqual(_trials_for_confidence(4, 0.9), 13)
\ No newline at end of file
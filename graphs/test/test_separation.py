@@ -0,0 +1,67 @@
+import logging
+import unittest
+from graphs.primitives import Graph, GraphException
+from graphs.separation import DegreesOfSeparation
+
+_log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestDegreesOfSeparation(unittest.TestCase):
+    def setUp(self):
+        """A path a-b-c-d, plus an isolated node e."""
+        self.graph = Graph()
+        self.graph.add_nodes(['a', 'b', 'c', 'd', 'e'])
+        self.graph.add_edges([('a', 'b'), ('b', 'c'), ('c', 'd')])
+
+    def test_distance(self):
+        """Test distances between any pair of nodes, and that repeat queries use the cached tree."""
+        separation = DegreesOfSeparation(self.graph)
+
+        self.assertEqual(separation.distance('b', 'd'), 2)
+        self.assertEqual(separation.distance('b', 'a'), 1)
+        self.assertEqual(separation.distance('b', 'b'), 0)
+        self.assertIsNone(separation.distance('b', 'e'))
+        # The tree from b also answers queries to b.
+        self.assertEqual(separation.distance('d', 'b'), 2)
+        self.assertEqual((separation.hits, separation.misses), (4, 1))
+
+        self.assertEqual(separation.distance('a', 'd'), 3)
+        self.assertEqual(separation.misses, 2)
+        with self.assertRaises(GraphException):
+            separation.distance('a', 'z')
+
+    def test_path(self):
+        """Test that paths run from source to target, whichever end the cached tree is rooted at."""
+        separation = DegreesOfSeparation(self.graph)
+        labels = lambda nodes: [node.label for node in nodes]
+
+        self.assertEqual(labels(separation.path('a', 'c')), ['a', 'b', 'c'])
+        self.assertEqual(labels(separation.path('c', 'a')), ['c', 'b', 'a'])
+        self.assertEqual(labels(separation.path('a', 'a')), ['a'])
+        self.assertEqual(separation.path('a', 'e'), [])
+        self.assertEqual(separation.misses, 1)
+
+    def test_eviction(self):
+        """Test that the least recently used trees are evicted to stay within the limits."""
+        separation = DegreesOfSeparation(self.graph, max_trees=2)
+        node_a, node_d, node_e = (self.graph.get_node_by_label(label) for label in 'ade')
+
+        separation.distance('a', 'b')
+        separation.distance('d', 'b')
+        separation.distance('a', 'c')  # Makes a the most recently used
+        separation.distance('e', 'e')
+
+        self.assertEqual(separation.cached_sources, [node_a, node_e])
+
+        budget = separation.cached_bytes
+        separation = DegreesOfSeparation(self.graph, memory_budget=budget)
+        separation.distance('a', 'b')
+        separation.distance('e', 'e')
+        self.assertEqual(separation.cached_sources, [node_a, node_e])
+        separation.distance('d', 'b')  # Needs as much space as the tree from a
+        self.assertEqual(separation.cached_sources, [node_e, node_d])
+        self.assertLessEqual(separation.cached_bytes, budget)
+
+        separation.clear()
+        self.assertEqual((separation.cached_sources, separation.cached_bytes), ([], 0))
@@ -0,0 +1,81 @@
+import logging
+import os
+import tempfile
+from graphs.compact import CompactGraph
+from graphs.primitives import Graph, GraphException
+from graphs.snapshot import load_snapshot, write_snapshot, SnapshotException
+from graphs.test.test_primitives import GraphTestCase
+
+_log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+
+
+class TestSnapshot(GraphTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'graph.snp')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """Test that a loaded snapshot has the same labels and adjacency as the graph it was written from."""
+        self._setup_triangle_graph()
+        self.graph.add_nodes(['d', 'Zoë'])
+        self.graph.add_edge_by_label('d', 'Zoë')
+        compact = CompactGraph.from_graph(self.graph)
+
+        write_snapshot(self.graph, self.path)
+        loaded = load_snapshot(self.path)
+
+        self.assertEqual(list(loaded.labels), list(compact.labels))
+        self.assertEqual(list(loaded.offsets), list(compact.offsets))
+        self.assertEqual(list(loaded.targets), list(compact.targets))
+        self.assertFalse(loaded.directed)
+        self.assertEqual(len(loaded.to_graph().edges), 4)
+
+    def test_label_lookup(self):
+        """Test that labels are found by binary search, with duplicates resolving to the first node."""
+        labels = ['m', 'b', 'z', 'b', 'a']
+        compact = CompactGraph(labels, [0] * (len(labels) + 1), [])
+
+        write_snapshot(compact, self.path)
+        loaded = load_snapshot(self.path)
+
+        for label in ['a', 'b', 'm', 'z']:
+            self.assertEqual(loaded.get_index_by_label(label), labels.index(label))
+        for label in ['', 'c', 'zz']:
+            self.assertRaises(GraphException, loaded.get_index_by_label, label)
+
+    def test_traversal(self):
+        """Test that BFS runs directly over the mapped arrays."""
+        self._setup_basic_graph()
+        self.graph.add_nodes(['c', 'd'])
+        self.graph.add_edges([('b', 'c'), ('c', 'd')])
+
+        write_snapshot(self.graph, self.path)
+        loaded = load_snapshot(self.path)
+        a, d = loaded.get_index_by_label('a'), loaded.get_index_by_label('d')
+
+        self.assertEqual([loaded.labels[index] for index in loaded.shortest_path(a, d)], ['a', 'b', 'c', 'd'])
+        self.assertEqual(len(loaded.bfs_connected_regions()), 1)
+
+    def test_empty_graph(self):
+        """Test that a graph with no nodes survives a round trip."""
+        write_snapshot(Graph(), self.path)
+
+        self.assertEqual(load_snapshot(self.path).node_count, 0)
+
+    def test_bad_file(self):
+        """Test that loading a file which isn't a snapshot raises SnapshotException."""
+        with open(self.path, 'wb') as snapshot_file:
+            snapshot_file.write(b'Not a snapshot, but long enough to hold a header.')
+
+        self.assertRaises(SnapshotException, load_snapshot, self.path)
+
+    def test_non_string_labels(self):
+        """Test that only string labels can be written."""
+        graph = Graph()
+        graph.add_node_by_label(('a', 1))
+
+        self.assertRaises(SnapshotException, write_snapshot, graph, self.path)
@@ -0,0 +1,33 @@
+import unittest
+from graphs.union_find import DisjointSet
+
+
+class TestDisjointSet(unittest.TestCase):
+    def test_union(self):
+        """Test that union merges sets and tracks their count and sizes."""
+        sets = DisjointSet(5)
+
+        self.assertTrue(sets.union(0, 1))
+        self.assertTrue(sets.union(3, 4))
+        self.assertTrue(sets.union(1, 4))
+        self.assertFalse(sets.union(0, 3))
+
+        self.assertEqual(sets.count, 2)
+        self.assertTrue(sets.connected(0, 3))
+        self.assertFalse(sets.connected(0, 2))
+        self.assertEqual(sets.size(4), 4)
+        self.assertEqual(sets.size(2), 1)
+
+    def test_add_and_reset(self):
+        """Test that add creates singleton sets and reset splits every set up again."""
+        sets = DisjointSet()
+        first, second = sets.add(), sets.add()
+        sets.union(first, second)
+
+        self.assertEqual((len(sets), sets.count), (2, 1))
+
+        sets.reset()
+
+        self.assertEqual(sets.count, 2)
+        self.assertFalse(sets.connected(first, second))
+        self.assertEqual(sets.size(first), 1)
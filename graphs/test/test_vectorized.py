@@ -0,0 +1,72 @@
+import logging
+import os
+from random import Random
+import tempfile
+import unittest
+from graphs.primitives import Graph, GraphException
+from graphs.snapshot import load_snapshot, write_snapshot
+from graphs.vectorized import VectorizedGraph, VectorizedException, UNREACHED, numpy
+
+_log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.DEBUG)
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed.')
+class TestVectorizedGraph(unittest.TestCase):
+    def _setup_graph(self):
+        """Two paths, a-b-c-d and e-f, plus an isolated node g."""
+        graph = Graph()
+        graph.add_nodes('abcdefg')
+        graph.add_edges([('a', 'b'), ('b', 'c'), ('c', 'd'), ('e', 'f')])
+        return graph
+
+    def test_layers_match_breadth_first_search(self):
+        """Test that vectorized layers match Graph.breadth_first_search on a random graph."""
+        rng = Random(2)
+        graph = Graph()
+        graph.add_nodes(range(300))
+        graph.add_edges((rng.randrange(300), rng.randrange(300)) for _ in range(450))
+        vectorized = VectorizedGraph.from_graph(graph)
+
+        for start in [0, 17, 150]:
+            _, explored = graph.breadth_first_search(graph.nodes[start])
+            expected = {node.label: layer for node, layer in explored}
+            layers = vectorized.breadth_first_layers([start])
+
+            self.assertEqual({i: int(layer) for i, layer in enumerate(layers) if layer != UNREACHED}, expected)
+            found, vectorized_explored = vectorized.breadth_first_search(start, end=299)
+            self.assertEqual(sorted(vectorized_explored), sorted(expected.items()))
+            self.assertEqual(found, 299 in expected)
+
+    def test_multi_source(self):
+        """Test that a multi-source search gives the distance to, and identity of, the nearest source."""
+        vectorized = VectorizedGraph.from_graph(self._setup_graph())
+        a, d, e = (vectorized.get_index_by_label(label) for label in 'ade')
+
+        layers, origins = vectorized.breadth_first_layers([a, d, e], return_origins=True)
+
+        self.assertEqual(layers.tolist(), [0, 1, 1, 0, 0, 1, UNREACHED])
+        self.assertEqual(origins.tolist(), [a, a, d, d, e, e, UNREACHED])
+        self.assertEqual(vectorized.breadth_first_layers([a], max_layer=2).tolist(),
+                         [0, 1, 2, UNREACHED, UNREACHED, UNREACHED, UNREACHED])
+        self.assertEqual(vectorized.breadth_first_layers([]).tolist(), [UNREACHED] * 7)
+
+        with self.assertRaises(VectorizedException):
+            vectorized.breadth_first_layers([7])
+        with self.assertRaises(GraphException):
+            vectorized.get_index_by_label('z')
+
+    def test_directed_and_snapshot(self):
+        """Test that searches follow edge direction, and run directly on a snapshot's arrays."""
+        graph = Graph()
+        graph.add_nodes('abc')
+        graph.add_edges([('a', 'b'), ('c', 'b')], directed=True)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.snp')
+            write_snapshot(graph, path)
+            vectorized = VectorizedGraph.from_compact(load_snapshot(path))
+
+            self.assertEqual(vectorized.breadth_first_layers([0]).tolist(), [0, 1, UNREACHED])
+            self.assertEqual(vectorized.breadth_first_layers([2]).tolist(), [UNREACHED, 1, 0])
+            self.assertEqual(vectorized.get_index_by_label('c'), 2)
@@ -0,0 +1,53 @@
+class DisjointSet:
+    """Disjoint sets over the integers 0..n-1, with union by size and path halving.
+
+    Items are plain list indices, so find and union allocate nothing.
+    """
+    def __init__(self, size=0):
+        self.parents = list(range(size))
+        self.sizes = [1] * size
+        self.count = size
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self):
+        """Add a new singleton set and return its item."""
+        item = len(self.parents)
+        self.parents.append(item)
+        self.sizes.append(1)
+        self.count += 1
+        return item
+
+    def reset(self):
+        """Split every item back into its own set, reusing the existing lists."""
+        self.parents[:] = range(len(self.parents))
+        self.sizes[:] = [1] * len(self.sizes)
+        self.count = len(self.parents)
+
+    def find(self, item):
+        """Get the representative item of the set containing 'item'."""
+        parents = self.parents
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]
+            item = parents[item]
+        return item
+
+    def union(self, first, second):
+        """Merge the sets containing 'first' and 'second'. Returns False if they were already merged."""
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self.sizes[first] < self.sizes[second]:
+            first, second = second, first
+        self.parents[second] = first
+        self.sizes[first] += self.sizes[second]
+        self.count -= 1
+        return True
+
+    def connected(self, first, second):
+        return self.find(first) == self.find(second)
+
+    def size(self, item):
+        """Get the number of items in the set containing 'item'."""
+        return self.sizes[self.find(item)]
@@ -0,0 +1,132 @@
+"""Level-synchronous breadth-first search with NumPy.
+
+Each BFS layer is expanded by a handful of array operations over the whole frontier, instead of a
+Python loop over its edges. The adjacency structure is the CSR form of a CompactGraph, wrapped in
+NumPy arrays; for a CompactGraph loaded from a snapshot the arrays share the mapped file.
+
+NumPy is an optional dependency, needed only by this module.
+"""
+import logging
+from graphs import instrumentation
+from graphs.compact import CompactGraph
+from graphs.primitives import GraphException
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_log = logging.getLogger(__name__)
+
+# Layer of nodes that no source reaches.
+UNREACHED = -1
+
+
+class VectorizedException(Exception):
+    pass
+
+
+class VectorizedGraph:
+    """A read-only graph of NumPy CSR arrays: the neighbours of node i are targets[offsets[i]:offsets[i + 1]]."""
+    def __init__(self, labels, offsets, targets, index=None):
+        """'index' maps each label to the first node carrying it; if not given, a dict is built from 'labels'."""
+        if numpy is None:
+            raise VectorizedException('NumPy is required for vectorized traversal.')
+        self.labels = labels
+        self.offsets = numpy.asarray(offsets)
+        self.targets = numpy.asarray(targets)
+
+        if index is None:
+            index = {}
+            for i, label in enumerate(labels):
+                index.setdefault(label, i)
+        self._index = index
+
+    @classmethod
+    def from_compact(cls, compact):
+        """Wrap the arrays of a CompactGraph without copying them."""
+        if numpy is None:
+            raise VectorizedException('NumPy is required for vectorized traversal.')
+        return cls(compact.labels, numpy.frombuffer(compact.offsets, dtype=numpy.int64),
+                   numpy.frombuffer(compact.targets, dtype=numpy.int32), index=compact._index)
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Build a VectorizedGraph from a primitives.Graph, with nodes indexed in graph order."""
+        return cls.from_compact(CompactGraph.from_graph(graph))
+
+    @property
+    def node_count(self):
+        return len(self.offsets) - 1
+
+    def get_index_by_label(self, label):
+        """Get the index of the first node with the specified label."""
+        try:
+            return self._index[label]
+        except KeyError:
+            raise GraphException('No node with label "%s"' % label)
+
+    def breadth_first_layers(self, sources, max_layer=None, return_origins=False):
+        """Run one breadth-first search from every node index in 'sources' at once.
+
+        Returns an array holding the layer of each node: its distance from the nearest source, or
+        UNREACHED. From a single source, the layers match Graph.breadth_first_search. With
+        'return_origins', also returns an array of the nearest source to each node (UNREACHED for
+        unreached nodes), breaking ties between equally near sources by the lowest-indexed parent.
+        'max_layer' stops the search after that many layers.
+        """
+        offsets, targets = self.offsets, self.targets
+        layers = numpy.full(self.node_count, UNREACHED, dtype=numpy.int32)
+        frontier = numpy.unique(numpy.asarray(sources, dtype=numpy.int64))
+        if len(frontier) and (frontier[0] < 0 or frontier[-1] >= self.node_count):
+            raise VectorizedException('Source index out of range.')
+        layers[frontier] = 0
+        origins = None
+        if return_origins:
+            origins = numpy.full(self.node_count, UNREACHED, dtype=numpy.int64)
+            origins[frontier] = frontier
+
+        layer = 0
+        frontier_sizes = []
+        edges_scanned = 0
+        while len(frontier) and (max_layer is None or layer < max_layer):
+            frontier_sizes.append(len(frontier))
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            total = int(counts.sum())
+            edges_scanned += total
+            if not total:
+                break
+
+            # Position in 'targets' of every neighbour of every frontier node, in frontier order.
+            slots = numpy.arange(total) + numpy.repeat(starts - (numpy.cumsum(counts) - counts), counts)
+            neighbours = targets[slots]
+            unvisited = layers[neighbours] == UNREACHED
+            # Each newly reached node, and where it first appears among the unvisited neighbours.
+            next_frontier, first = numpy.unique(neighbours[unvisited], return_index=True)
+            if origins is not None:
+                parents = numpy.repeat(frontier, counts)[unvisited][first]
+                origins[next_frontier] = origins[parents]
+
+            layer += 1
+            layers[next_frontier] = layer
+            frontier = next_frontier
+
+        if instrumentation.hook is not None:
+            instrumentation.hook.record_search('vectorized bfs', sum(frontier_sizes), edges_scanned, frontier_sizes)
+        return (layers, origins) if return_origins else layers
+
+    def breadth_first_search(self, start, end=None):
+        """Perform a breadth-first search from node index 'start', like CompactGraph.breadth_first_search.
+
+        Returns (found, explored), where explored is a list of (index, layer) tuples for every node
+        reached, ordered by layer and then by index.
+        """
+        layers = self.breadth_first_layers([start])
+        reached = numpy.flatnonzero(layers != UNREACHED)
+        order = reached[numpy.argsort(layers[reached], kind='stable')]
+        found = end is not None and layers[end] != UNREACHED
+        return found, [(int(node), int(layers[node])) for node in order]
+
+    def __repr__(self):
+        return 'VectorizedGraph(nodes=%s, adjacency entries=%s)' % (self.node_count, len(self.targets))
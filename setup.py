@@ -16,6 +16,9 @@ setup(
     entry_points={
         'console_scripts': [
             'kevin_bacon = graphs.kevin_bacon:main',
+            'bacon_server = graphs.bacon_server:main',
+            'bacon_client = graphs.bacon_client:main',
+            'bacon_update = graphs.bacon_update:main',
         ],
     }
 )
\ No newline at end of file